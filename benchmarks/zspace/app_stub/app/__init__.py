@@ -0,0 +1,3 @@
+"""
+MoviePilot app.* 最小替身，仅供离线基准测试加载插件使用
+"""
@@ -0,0 +1,6 @@
+class Settings:
+    TZ = "Asia/Shanghai"
+    USER_AGENT = "Mozilla/5.0 (benchmark) MoviePilot"
+
+
+settings = Settings()
@@ -0,0 +1,27 @@
+from typing import Any, Dict, Optional
+
+
+class Event:
+
+    def __init__(self, event_type: Any, event_data: Optional[Dict[str, Any]] = None):
+        self.event_type = event_type
+        self.event_data = event_data or {}
+
+
+class EventManager:
+    """
+    只记录注册关系，不分发事件
+    """
+
+    def __init__(self):
+        self.handlers = {}
+
+    def register(self, etype: Any):
+        def decorator(func):
+            self.handlers.setdefault(etype, []).append(func)
+            return func
+
+        return decorator
+
+
+eventmanager = EventManager()
@@ -0,0 +1,8 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+
+# 内存数据库，多线程共享同一连接
+Engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+SessionFactory = sessionmaker(bind=Engine)
+Base = declarative_base()
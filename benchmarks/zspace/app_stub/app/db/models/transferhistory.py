@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, Integer, String
+
+from app.db import Base, Engine
+
+
+class TransferHistory(Base):
+    """
+    转移历史，只保留插件用到的字段
+    """
+    __tablename__ = "transferhistory"
+    id = Column(Integer, primary_key=True, index=True)
+    dest = Column(String)
+    type = Column(String)
+    category = Column(String)
+    date = Column(String, index=True)
+    status = Column(Boolean, default=True)
+
+
+Base.metadata.create_all(Engine)
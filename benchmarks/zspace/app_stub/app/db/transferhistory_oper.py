@@ -0,0 +1,25 @@
+from typing import Any, Dict, List
+
+from app.db import SessionFactory
+from app.db.models.transferhistory import TransferHistory
+
+
+class TransferHistoryOper:
+    """
+    转移历史替身，数据由基准测试通过 replace_all 写入
+    """
+
+    def list_by_date(self, date: str) -> List[TransferHistory]:
+        with SessionFactory() as db:
+            rows = db.query(TransferHistory).filter(TransferHistory.date > date) \
+                .order_by(TransferHistory.id.desc()).all()
+            db.expunge_all()
+            return rows
+
+    @staticmethod
+    def replace_all(rows: List[Dict[str, Any]]):
+        with SessionFactory() as db:
+            db.query(TransferHistory).delete()
+            if rows:
+                db.bulk_insert_mappings(TransferHistory, rows)
+            db.commit()
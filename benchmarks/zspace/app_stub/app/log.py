@@ -0,0 +1,7 @@
+import logging
+import os
+
+logging.basicConfig(level=os.environ.get("BENCH_LOG_LEVEL", "WARNING"),
+                    format="%(asctime)s %(levelname)s %(message)s")
+
+logger = logging.getLogger("moviepilot")
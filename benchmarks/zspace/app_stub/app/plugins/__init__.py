@@ -0,0 +1,37 @@
+import queue
+from typing import Any, Dict, List, Optional
+
+
+class _PluginBase:
+    """
+    插件基类替身：插件数据与配置保存在内存，消息只计数
+    """
+
+    def __init__(self):
+        self.config: Dict[str, Any] = {}
+        self.plugin_data: Dict[str, Any] = {}
+        self.messages: List[Dict[str, Any]] = []
+        self.systemmessage = queue.Queue()
+
+    def update_config(self, config: dict, plugin_id: Optional[str] = None) -> bool:
+        self.config = config
+        return True
+
+    def get_config(self, plugin_id: Optional[str] = None) -> Any:
+        return self.config
+
+    def save_data(self, key: str, value: Any, plugin_id: Optional[str] = None):
+        self.plugin_data[key] = value
+
+    def get_data(self, key: Optional[str] = None, plugin_id: Optional[str] = None) -> Any:
+        if key is None:
+            return self.plugin_data
+        return self.plugin_data.get(key)
+
+    def del_data(self, key: str, plugin_id: Optional[str] = None) -> Any:
+        return self.plugin_data.pop(key, None)
+
+    def post_message(self, channel: Any = None, mtype: Any = None, title: Optional[str] = None,
+                     text: Optional[str] = None, image: Optional[str] = None, link: Optional[str] = None,
+                     userid: Optional[str] = None, **kwargs):
+        self.messages.append({"mtype": mtype, "title": title, "text": text})
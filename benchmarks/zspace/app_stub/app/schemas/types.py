@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class EventType(Enum):
+    PluginAction = "plugin.action"
+    TransferComplete = "transfer.complete"
+
+
+class NotificationType(Enum):
+    Plugin = "插件"
@@ -0,0 +1,55 @@
+from typing import Any, Dict, Optional
+
+import requests
+
+
+def cookie_parse(cookies_str: str, array: bool = False) -> Any:
+    """
+    解析cookie字符串为字典
+    """
+    if not cookies_str:
+        return {}
+    cookie_dict = {}
+    for cookie in cookies_str.split(";"):
+        if "=" not in cookie:
+            continue
+        key, value = cookie.split("=", 1)
+        cookie_dict[key.strip()] = value.strip()
+    if array:
+        return [{"name": k, "value": v} for k, v in cookie_dict.items()]
+    return cookie_dict
+
+
+class RequestUtils:
+    """
+    与MoviePilot RequestUtils接口一致的简化实现
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, ua: Optional[str] = None,
+                 cookies: Any = None, proxies: Optional[dict] = None, session: Optional[requests.Session] = None,
+                 timeout: Optional[int] = None, **kwargs):
+        self._headers = headers or {}
+        if ua:
+            self._headers["User-Agent"] = ua
+        if isinstance(cookies, str):
+            cookies = cookie_parse(cookies)
+        self._cookies = cookies
+        self._proxies = proxies
+        self._session = session
+        self._timeout = timeout or 20
+
+    cookie_parse = staticmethod(cookie_parse)
+
+    def _request(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        try:
+            return (self._session or requests).request(method, url, headers=self._headers, cookies=self._cookies,
+                                                       proxies=self._proxies, timeout=self._timeout,
+                                                       verify=False, **kwargs)
+        except requests.exceptions.RequestException:
+            return None
+
+    def post_res(self, url: str, data: Any = None, params: dict = None, **kwargs) -> Optional[requests.Response]:
+        return self._request("post", url, data=data, params=params, **kwargs)
+
+    def get_res(self, url: str, params: dict = None, **kwargs) -> Optional[requests.Response]:
+        return self._request("get", url, params=params, **kwargs)
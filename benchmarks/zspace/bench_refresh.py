@@ -0,0 +1,315 @@
+"""
+ZspaceMediaFresh / ZspaceSysMsg 离线基准测试
+
+使用 fake_zspace 替身服务和 app_stub 中的 MoviePilot 替身加载插件，统计：
+  - 刷新耗时（墙钟时间）
+  - 各接口请求数、建立的TCP连接数
+  - 运行期间线程数峰值
+  - 多个极空间并行刷新，其中一个较慢或离线时的耗时
+
+需要安装插件自身依赖：requests、pytz、apscheduler、sqlalchemy
+
+用法：
+  python benchmarks/zspace/bench_refresh.py
+  python benchmarks/zspace/bench_refresh.py --classifications 1,10,50 --rows 0,100000 --json bench.json
+"""
+import argparse
+import importlib.util
+import inspect
+import json
+import socket
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parents[1]
+sys.path.insert(0, str(BENCH_DIR / "app_stub"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from app.db.transferhistory_oper import TransferHistoryOper  # noqa: E402
+from fake_zspace import FAKE_COOKIE, FakeZspaceServer, FakeZspaceState  # noqa: E402
+
+# 网盘媒体库路径
+CLOUD_PATH = "/cloud/media"
+
+
+def load_plugin(rel_dir: str, module_name: str):
+    """
+    以包的形式加载插件目录，支持插件内的相对导入
+    """
+    path = ROOT / rel_dir
+    spec = importlib.util.spec_from_file_location(module_name, path / "__init__.py",
+                                                  submodule_search_locations=[str(path)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class ThreadSampler:
+    """
+    后台采样线程数峰值
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.baseline = 0
+        self.peak = 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            self._stop.wait(self._interval)
+
+    def __enter__(self) -> "ThreadSampler":
+        self.baseline = threading.active_count()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+
+
+def make_history(rows: int, categories: List[str], match_ratio: float = 0.2, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    生成最近一天内的转移历史，match_ratio 比例的记录位于网盘媒体库路径
+    """
+    rnd = random.Random(seed)
+    now = datetime.now()
+    history = []
+    for i in range(rows):
+        date = (now - timedelta(seconds=rnd.randint(60, 23 * 3600))).strftime('%Y-%m-%d %H:%M:%S')
+        in_cloud = rnd.random() < match_ratio
+        mtype = "电影" if rnd.random() < 0.5 else "电视剧"
+        history.append({
+            "date": date,
+            "status": rnd.random() < 0.95,
+            "dest": f"{CLOUD_PATH if in_cloud else '/local/media'}/{mtype}/title{i}/file{i}.mkv",
+            "type": mtype,
+            "category": rnd.choice(categories)
+        })
+    # id 与时间同序
+    history.sort(key=lambda row: row["date"])
+    for i, row in enumerate(history):
+        row["id"] = i + 1
+    return history
+
+
+def media_fresh_config(host: str, **kwargs) -> Dict[str, Any]:
+    config = {
+        "enabled": False,
+        "onlyonce": False,
+        "zsphost": host,
+        "zspcookie": FAKE_COOKIE,
+        "timescope": 1,
+        "unit": "day",
+        "waittime": 60,
+        "startswith": CLOUD_PATH,
+    }
+    config.update(kwargs)
+    return config
+
+
+def full_refresh(plugin):
+    """
+    按完整时间范围刷新；改动前的插件 refresh() 没有 incremental 参数
+    """
+    if "incremental" in inspect.signature(plugin.refresh).parameters:
+        plugin.refresh(incremental=False)
+    else:
+        plugin.refresh()
+
+
+def measure(state: FakeZspaceState, func) -> Dict[str, Any]:
+    state.reset_counters()
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        func()
+        wall = time.perf_counter() - start
+    return {
+        "wall_seconds": round(wall, 3),
+        "requests": dict(state.requests),
+        "total_requests": sum(state.requests.values()),
+        "connections": state.connections,
+        "peak_threads": sampler.peak,
+        "extra_threads": sampler.peak - sampler.baseline,
+    }
+
+
+def bench_classifications(plugin_cls, counts: List[int], task_min: float, task_max: float) -> List[Dict[str, Any]]:
+    """
+    刷新全部分类，分类数量递增
+    """
+    results = []
+    for count in counts:
+        state = FakeZspaceState(classifications=count, task_min=task_min, task_max=task_max)
+        with FakeZspaceServer(state) as server:
+            plugin = plugin_cls()
+            plugin.init_plugin(media_fresh_config(server.url, flushall=True))
+            result = measure(state, lambda: full_refresh(plugin))
+            plugin.stop_service()
+        slowest = max(state.durations.values()) if state.durations else 0
+        result.update({"scenario": "classifications", "classifications": count,
+                       "sum_task_seconds": round(sum(state.durations.values()), 3),
+                       "slowest_task_seconds": round(slowest, 3),
+                       "rescans_finished": len(state.rescans_finished)})
+        results.append(result)
+    return results
+
+
+def bench_history(plugin_cls, row_counts: List[int]) -> List[Dict[str, Any]]:
+    """
+    转移历史数量递增，分别统计首次刷新与无新增记录时的再次刷新
+    """
+    results = []
+    categories = [f"分类{i}" for i in range(5)]
+    for rows in row_counts:
+        TransferHistoryOper.replace_all(make_history(rows, categories))
+        state = FakeZspaceState(classifications=len(categories), task_min=0, task_max=0)
+        with FakeZspaceServer(state) as server:
+            plugin = plugin_cls()
+            plugin.init_plugin(media_fresh_config(server.url, moivelib=",".join(categories[:3]),
+                                                  tvlib=",".join(categories[2:])))
+            for run in ("first", "repeat"):
+                result = measure(state, lambda: plugin.refresh())
+                result.update({"scenario": "history", "rows": rows, "run": run})
+                results.append(result)
+            plugin.stop_service()
+    TransferHistoryOper.replace_all([])
+    return results
+
+
+def bench_sysmsg(plugin_cls, message_counts: List[int]) -> List[Dict[str, Any]]:
+    """
+    系统消息推送，未读消息数量递增
+    """
+    results = []
+    for count in message_counts:
+        state = FakeZspaceState(classifications=0, messages=count)
+        with FakeZspaceServer(state) as server:
+            plugin = plugin_cls()
+            plugin.init_plugin({"enabled": False, "zsphost": server.url, "zspcookie": FAKE_COOKIE})
+            result = measure(state, plugin.pushmsg)
+            plugin.stop_service()
+        result.update({"scenario": "sysmsg", "messages": count, "posted": len(plugin.messages)})
+        results.append(result)
+    return results
+
+
+def bench_shared(media_cls, msg_cls, messages: int) -> List[Dict[str, Any]]:
+    """
+    刷新极影视与系统通知连接同一极空间，统计两者合计的连接数
+    """
+    state = FakeZspaceState(classifications=3, task_min=0, task_max=0, messages=messages)
+    with FakeZspaceServer(state) as server:
+        media = media_cls()
+        media.init_plugin(media_fresh_config(server.url, flushall=True))
+        sys_msg = msg_cls()
+        sys_msg.init_plugin({"enabled": False, "zsphost": server.url, "zspcookie": FAKE_COOKIE})
+
+        def run():
+            full_refresh(media)
+            sys_msg.pushmsg()
+
+        result = measure(state, run)
+        media.stop_service()
+        sys_msg.stop_service()
+    result.update({"scenario": "shared", "messages": messages, "posted": len(sys_msg.messages)})
+    return [result]
+
+
+def offline_url() -> str:
+    """
+    没有服务监听的本地地址，模拟离线的极空间
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def bench_multi(plugin_cls, task_min: float, task_max: float) -> List[Dict[str, Any]]:
+    """
+    两个极空间并行刷新全部分类，第二个极空间分别为较慢及离线，统计各自耗时
+    各极空间的耗时取自插件运行数据，不支持多极空间的插件跳过
+    """
+    results = []
+    if not hasattr(plugin_cls, "get_metrics"):
+        print("插件不支持多极空间，跳过两个极空间并行刷新")
+        return results
+    fast = FakeZspaceState(classifications=3, task_min=task_min, task_max=task_min)
+    slow = FakeZspaceState(classifications=3, task_min=task_max, task_max=task_max)
+    with FakeZspaceServer(fast) as fast_server, FakeZspaceServer(slow) as slow_server:
+        for second, url in (("slow", slow_server.url), ("offline", offline_url())):
+            targets = [{"name": "NAS2", "zsphost": url, "zspcookie": FAKE_COOKIE, "startswith": [CLOUD_PATH]}]
+            plugin = plugin_cls()
+            plugin.init_plugin(media_fresh_config(fast_server.url, flushall=True, targets=json.dumps(targets)))
+            plugin.save_data("metrics", [])
+            result = measure(fast, lambda: full_refresh(plugin))
+            hosts = {run["host"]: run for run in plugin.get_metrics()}
+            plugin.stop_service()
+            result.update({"scenario": "multi", "second": second,
+                           "first_seconds": hosts[fast_server.url]["total"],
+                           "first_status": hosts[fast_server.url]["status"],
+                           "second_seconds": hosts["NAS2"]["total"],
+                           "second_status": hosts["NAS2"]["status"]})
+            results.append(result)
+    return results
+
+
+def print_table(title: str, results: List[Dict[str, Any]], keys: List[str]):
+    columns = keys + ["wall_seconds", "total_requests", "connections", "extra_threads"]
+    print(f"\n== {title}")
+    print(" | ".join(f"{col:>20}" for col in columns))
+    for result in results:
+        print(" | ".join(f"{str(result.get(col, '')):>20}" for col in columns))
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZspaceMediaFresh / ZspaceSysMsg 离线基准测试")
+    parser.add_argument("--classifications", type=parse_ints, default=parse_ints("1,5,10"),
+                        help="分类数量，逗号分隔，如 1,10,25,50")
+    parser.add_argument("--rows", type=parse_ints, default=parse_ints("0,1000,10000,100000"),
+                        help="转移历史数量，逗号分隔")
+    parser.add_argument("--messages", type=parse_ints, default=parse_ints("0,5,20"),
+                        help="未读系统消息数量，逗号分隔")
+    parser.add_argument("--task-min", type=float, default=1.0, help="刷新任务最短耗时(秒)")
+    parser.add_argument("--task-max", type=float, default=5.0, help="刷新任务最长耗时(秒)")
+    parser.add_argument("--plugin", default="plugins.v2/zspacemediafresh", help="ZspaceMediaFresh 插件目录")
+    parser.add_argument("--json", help="结果输出到json文件")
+    args = parser.parse_args()
+
+    media_fresh = load_plugin(args.plugin, "zspacemediafresh").ZspaceMediaFresh
+    sys_msg = load_plugin("plugins/zspacesysmsg", "zspacesysmsg").ZspaceSysMsg
+
+    results = {
+        "classifications": bench_classifications(media_fresh, args.classifications, args.task_min, args.task_max),
+        "history": bench_history(media_fresh, args.rows),
+        "sysmsg": bench_sysmsg(sys_msg, args.messages),
+        "shared": bench_shared(media_fresh, sys_msg, max(args.messages)),
+        "multi": bench_multi(media_fresh, args.task_min, args.task_max),
+    }
+    print_table("刷新全部分类", results["classifications"],
+                ["classifications", "sum_task_seconds", "slowest_task_seconds"])
+    print_table("转移历史过滤", results["history"], ["rows", "run"])
+    print_table("系统消息推送", results["sysmsg"], ["messages", "posted"])
+    print_table("两个插件连接同一极空间", results["shared"], ["messages", "posted"])
+    print_table("两个极空间并行刷新", results["multi"],
+                ["second", "first_seconds", "first_status", "second_seconds", "second_status"])
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+极空间web接口离线替身
+
+实现极影视分类列表、分类刷新、刷新结果以及系统消息接口，统计请求数和连接数，
+供基准测试在没有真实极空间NAS的情况下驱动 ZspaceMediaFresh / ZspaceSysMsg。
+
+单独运行：python fake_zspace.py --port 5055 --classifications 10
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# 与 FAKE_COOKIE 对应的token
+FAKE_TOKEN = "benchtoken"
+# 同时满足 ZspaceMediaFresh(zenithtoken等) 与 ZspaceSysMsg(token) 的cookie
+FAKE_COOKIE = (f"zenithtoken={FAKE_TOKEN}; token={FAKE_TOKEN}; device_id=bench-device; device=PC; "
+               f"version=2.0; _l=zh_cn; nas_id=bench-nas")
+
+
+class FakeZspaceState:
+    """
+    替身服务状态：分类、刷新任务、系统消息及请求统计
+    """
+
+    def __init__(self, classifications: int = 10, task_min: float = 1.0, task_max: float = 5.0,
+                 busy_ratio: float = 0.3, messages: int = 0, latency: float = 0.0, seed: int = 0):
+        """
+        :param classifications: 分类数量
+        :param task_min: 刷新任务最短耗时(秒)
+        :param task_max: 刷新任务最长耗时(秒)
+        :param busy_ratio: 任务进行中时返回 N120024 的比例
+        :param messages: 未读系统消息数量
+        :param latency: 每个请求附加的处理延迟(秒)
+        :param seed: 随机种子
+        """
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.busy_ratio = busy_ratio
+        self.latency = latency
+        self.classifications: List[Dict[str, Any]] = [
+            {"id": str(1000 + i), "name": f"分类{i}"} for i in range(classifications)
+        ]
+        # 分类ID -> 刷新耗时
+        self.durations: Dict[str, float] = {
+            item["id"]: self.random.uniform(task_min, task_max) for item in self.classifications
+        }
+        # task_id -> (分类ID, 提交时间)
+        self.tasks: Dict[str, Tuple[str, float]] = {}
+        self.messages: List[Dict[str, Any]] = [
+            {"id": i + 1, "is_new": 1, "title": f"系统消息{i + 1}", "content": "benchmark",
+             "created_at": time.strftime("%Y-%m-%d %H:%M:%S")} for i in range(messages)
+        ]
+        self.requests: Counter = Counter()
+        self.connections = 0
+        self.rescans_finished: Dict[str, float] = {}
+
+    def set_duration(self, name: str, seconds: float):
+        """
+        指定某个分类的刷新耗时
+        """
+        for item in self.classifications:
+            if item["name"] == name:
+                self.durations[item["id"]] = seconds
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = Counter()
+            self.connections = 0
+
+    def handle(self, path: str, form: Dict[str, str]) -> Dict[str, Any]:
+        with self.lock:
+            self.requests[path] += 1
+            if form.get("token") not in (None, FAKE_TOKEN):
+                return {"code": "N100001", "msg": "token invalid"}
+            if path == "/zvideo/classification/list":
+                return {"code": "200", "data": list(self.classifications)}
+            if path == "/zvideo/classification/rescan":
+                classification_id = form.get("classification_id")
+                if classification_id not in self.durations:
+                    return {"code": "N120001", "msg": "classification not found"}
+                task_id = f"task-{classification_id}-{len(self.tasks) + 1}"
+                self.tasks[task_id] = (classification_id, time.time())
+                return {"code": "200", "data": {"task_id": task_id}}
+            if path == "/zvideo/classification/rescan/result":
+                task = self.tasks.get(form.get("task_id"))
+                if not task:
+                    return {"code": "N120002", "msg": "task not found"}
+                classification_id, submit_time = task
+                if time.time() - submit_time >= self.durations[classification_id]:
+                    self.rescans_finished.setdefault(form.get("task_id"), time.time())
+                    return {"code": "200", "data": {"task_status": 2}}
+                code = "N120024" if self.random.random() < self.busy_ratio else "200"
+                return {"code": code, "data": {"task_status": 1}}
+            if path == "/action/list":
+                return {"code": "200", "data": {"list": list(self.messages)}}
+            if path == "/action/known":
+                ids = str(form.get("ids", "")).split(",")
+                for message in self.messages:
+                    if str(message["id"]) in ids:
+                        message["is_new"] = 0
+                return {"code": "200", "data": {}}
+            return {"code": "404", "msg": "not found"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: FakeZspaceState = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        form = {k: v[0] for k, v in parse_qs(body).items()}
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        payload = json.dumps(self.state.handle(urlparse(self.path).path, form)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class FakeZspaceServer:
+    """
+    在后台线程运行的替身服务
+    """
+
+    def __init__(self, state: FakeZspaceState, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (_Handler,), {"state": state})
+        self.state = state
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeZspaceServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-zspace", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeZspaceServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="极空间web接口离线替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--classifications", type=int, default=10)
+    parser.add_argument("--task-min", type=float, default=1.0)
+    parser.add_argument("--task-max", type=float, default=5.0)
+    parser.add_argument("--busy-ratio", type=float, default=0.3)
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    state = FakeZspaceState(classifications=args.classifications, task_min=args.task_min,
+                            task_max=args.task_max, busy_ratio=args.busy_ratio,
+                            messages=args.messages, latency=args.latency)
+    server = FakeZspaceServer(state, host=args.host, port=args.port).start()
+    print(f"fake zspace listening on {server.url}")
+    print(f"cookie: {FAKE_COOKIE}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
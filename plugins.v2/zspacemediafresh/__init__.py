@@ -1,21 +1,27 @@
 from datetime import datetime, timedelta
-from typing import Optional, Any, List, Dict, Tuple
+from typing import Optional, Any, Callable, List, Dict, Tuple
 
+import json
+import math
 import pytz
 import re
 import random
+import threading
 import time
-from urllib.parse import quote
+import uuid
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from app.core.event import eventmanager, Event
-from app.db.transferhistory_oper import TransferHistoryOper
 from app.core.config import settings
 from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas.types import EventType, NotificationType
-from app.utils.http import RequestUtils, cookie_parse
+
+from .history import summarize_transfers
+from .pathtrie import PathTrie
+from .target import ZspaceTarget
+from .zspace import CircuitBreaker, ZspaceClient, ZspaceCredential, ZspaceError
 
 
 class ZspaceMediaFresh(_PluginBase):
@@ -26,7 +32,7 @@ class ZspaceMediaFresh(_PluginBase):
     # 插件图标
     plugin_icon = "https://raw.githubusercontent.com/sssnto/MoviePilot-Plugins/main/icons/Zspace_B.png"
     # 插件版本
-    plugin_version = "3.0.2"
+    plugin_version = "3.19.6"
     # 插件作者
     plugin_author = "sssnto"
     # 作者主页
@@ -54,11 +60,56 @@ class ZspaceMediaFresh(_PluginBase):
     _notify = False
     _notifyaggregation = False
     _unit=None
+    _concurrency = None
+    _tasktimeout = None
+    _runtimeout = None
+    _eventrefresh = False
+    _debounce = None
+    _maxdelay = None
+    _classifyttl = None
+    _pathmapping = None
+    _idledays = None
+    _ratelimit = None
+    _maxinflight = None
+    _targetsconf = None
     _scheduler: Optional[BackgroundScheduler] = None
+    # 刷新目标，第一个为插件主配置的极空间，其余为多极空间配置中的极空间
+    _targets: List[ZspaceTarget] = []
+    # 首次轮询间隔(秒)及退避倍数
+    _poll_min_interval = 2
+    _poll_backoff = 2
+    # 入库事件首个事件时间，待刷新分类记录在各刷新目标中
+    _pending_since: Optional[float] = None
+    _pending_lock = threading.Lock()
+    # 各刷新目标的分类刷新状态、分类缓存、未完成任务及耗时模型均记录在目标中，持久化以便重启后继续
+    _state_lock = threading.Lock()
+    # 耗时模型的平滑系数及保留的样本数
+    _duration_alpha = 0.3
+    _duration_samples = 20
+    # 保留的运行数据条数
+    _metrics_keep = 50
+    # 刷新工作线程，同一时间只有一个刷新在执行
+    _worker: Optional[threading.Thread] = None
+    _worker_lock = threading.Lock()
+    # 刷新执行期间合并的刷新请求 {"incremental": 是否增量, "event": 是否处理入库事件, "job": 远程刷新任务ID}
+    _queued: Optional[Dict[str, Any]] = None
+    # 远程命令提交的刷新任务 {任务ID: {"id", "status", "result", "created", "started", "finished",
+    #                               "classifies": {分类名: 进度}, "waiters": 完成后通知的渠道及用户}}
+    _jobs: Dict[str, Dict[str, Any]] = {}
+    _job_lock = threading.Lock()
+    # 保留的刷新任务数
+    _jobs_keep = 10
+    # 取消刷新，停止插件时置位；工作线程通过线程本地变量持有自己启动时的取消标记
+    _cancel_event: threading.Event = threading.Event()
+    _local = threading.local()
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
         self.stop_service()
+        self._targets = []
+        self._cancel_event = threading.Event()
+        self._queued = None
+        self._jobs = {}
 
         if config:
             self._enabled = config.get("enabled")
@@ -69,18 +120,31 @@ class ZspaceMediaFresh(_PluginBase):
             self._waittime = config.get("waittime") or 60
             self._zspcookie=config.get("zspcookie")
             self._zsphost=config.get("zsphost")
-            self._moivelib = config.get("moivelib")
-            self._tvlib=config.get("tvlib")
+            self._moivelib = self.split_libs(config.get("moivelib"))
+            self._tvlib = self.split_libs(config.get("tvlib"))
             self._flushall=config.get("flushall")
             self._startswith=config.get("startswith")
             self._notify = config.get("notify")
             self._notifyaggregation =config.get("notifyaggregation")
             self._unit =config.get("unit") or "day"
-            if self._zsphost:           
-                if not self._zsphost.startswith("http"):
-                    self._zsphost = "http://" + self._zsphost
-                if  self._zsphost.endswith("/"):
-                    self._zsphost = self._zsphost[:-1]
+            self._concurrency = config.get("concurrency") or 3
+            self._tasktimeout = config.get("tasktimeout") or 60
+            self._runtimeout = config.get("runtimeout") or 180
+            self._eventrefresh = config.get("eventrefresh")
+            self._debounce = config.get("debounce") or 120
+            self._maxdelay = config.get("maxdelay") or 600
+            self._pending_since = None
+            self._classifyttl = config.get("classifyttl") or 1440
+            self._pathmapping = config.get("pathmapping")
+            self._idledays = config.get("idledays") or 0
+            self._ratelimit = self.__config_number(config.get("ratelimit"), 5)
+            self._maxinflight = self.__config_number(config.get("maxinflight"), 2)
+            self._targetsconf = config.get("targets")
+            self._zsphost = ZspaceClient.normalize_host(self._zsphost)
+            self._targets = self.__build_targets()
+            # 继续查询重启前未完成的刷新任务
+            if self._enabled and any(target.client and self.__journal_entries(target) for target in self._targets):
+                self.__queue_refresh(resume=True)
             # 加载模块
             if self._enabled or self._onlyonce:
                 # 定时服务
@@ -89,9 +153,10 @@ class ZspaceMediaFresh(_PluginBase):
                 # 立即运行一次
                 if self._onlyonce:
                     logger.info(f"极影视刷新服务启动，立即运行一次")
-                    self._scheduler.add_job(self.refresh, 'date',
+                    self._scheduler.add_job(self.__queue_refresh, 'date',
                                             run_date=datetime.now(
                                                 tz=pytz.timezone(settings.TZ)) + timedelta(seconds=3),
+                                            kwargs={"incremental": False},
                                             name="极影视刷新")
                     # 关闭一次性开关
                     self._onlyonce = False
@@ -100,21 +165,103 @@ class ZspaceMediaFresh(_PluginBase):
                 # 周期运行
                 if self._cron:
                     try:
-                        self._scheduler.add_job(func=self.refresh,
+                        self._scheduler.add_job(func=self.__queue_refresh,
                                                 trigger=CronTrigger.from_crontab(self._cron),
+                                                kwargs={"incremental": True},
                                                 name="极影视刷新")
                     except Exception as err:
                         logger.error(f"定时任务配置错误：{str(err)}")
                         # 推送实时消息
                         self.systemmessage.put(f"执行周期配置错误：{err}")
-                # 启动任务
-                if self._scheduler.get_jobs():
+                # 启动任务，入库触发刷新时需要调度器承载延迟任务
+                if self._scheduler.get_jobs() or self._eventrefresh:
                     self._scheduler.print_jobs()
                     self._scheduler.start()
 
     def get_state(self) -> bool:
         return self._enabled
 
+    def __queue_refresh(self, incremental: Optional[bool] = None, event: bool = False,
+                        job_id: Optional[str] = None, resume: bool = False) -> Optional[threading.Thread]:
+        """
+        提交刷新到工作线程，刷新进行中时合并到当前刷新结束后执行
+        :param incremental: 刷新入库记录，None不刷新
+        :param event: 刷新入库事件积累的分类
+        :param job_id: 远程刷新任务ID，执行时记录进度
+        :param resume: 继续查询重启前未完成的刷新任务
+        :return: 工作线程
+        """
+        with self._worker_lock:
+            queued = self._queued or {}
+            if resume:
+                queued["resume"] = True
+            if incremental is not None:
+                queued["incremental"] = queued.get("incremental", True) and incremental
+            if event:
+                queued["event"] = True
+            if job_id:
+                queued["job"] = job_id
+            self._queued = queued
+            # 已取消的工作线程（停止插件后仍在结束当前请求）不再接收新的刷新
+            if self._worker and self._worker.is_alive() and not self._cancel_event.is_set():
+                logger.info(f"极影视刷新进行中，本次刷新将在当前刷新结束后合并执行")
+                return self._worker
+            self._worker = threading.Thread(target=self.__run_worker, args=(self._cancel_event,),
+                                            name="zspacemediafresh", daemon=True)
+            self._worker.start()
+            return self._worker
+
+    def __run_worker(self, cancel: threading.Event):
+        """
+        工作线程：依次执行合并后的刷新请求，直到没有新的请求或被取消
+        """
+        self._local.cancel = cancel
+        try:
+            while not cancel.is_set():
+                with self._worker_lock:
+                    queued, self._queued = self._queued, None
+                    if not queued:
+                        break
+                job = self._jobs.get(queued.get("job"))
+                self.__update_job(job, status="进行中", started=time.time())
+                self._local.job = job
+                try:
+                    # 刷新会接管其中已在刷新中的分类，剩余的未完成任务再单独继续查询
+                    if "incremental" in queued:
+                        self.refresh(incremental=queued["incremental"])
+                    if queued.get("resume") and not cancel.is_set():
+                        self.__resume_journal()
+                    if queued.get("event") and not cancel.is_set():
+                        self.__flush_pending()
+                except Exception as e:
+                    logger.error(f"极影视刷新出错：{str(e)}")
+                    self.__update_job(job, result=f"出错：{str(e)}")
+                finally:
+                    self._local.job = None
+                    self.__finish_job(job, cancelled=cancel.is_set())
+        finally:
+            with self._worker_lock:
+                if self._worker is threading.current_thread():
+                    self._worker = None
+
+    def __cancelled(self) -> bool:
+        """
+        当前刷新是否已取消
+        """
+        cancel = getattr(self._local, "cancel", None)
+        return bool(cancel and cancel.is_set())
+
+    def __sleep(self, seconds: float) -> bool:
+        """
+        可被停止插件打断的等待
+        :return: 是否已取消
+        """
+        cancel = getattr(self._local, "cancel", None)
+        if cancel:
+            return cancel.wait(max(seconds, 0))
+        time.sleep(max(seconds, 0))
+        return False
+
     def __update_config(self):
         self.update_config(
             {
@@ -132,207 +279,1025 @@ class ZspaceMediaFresh(_PluginBase):
                 "startswith":self._startswith,
                 "notify": self._notify,
                 "notifyaggregation":self._notifyaggregation,
-                "unit":self._unit
+                "unit":self._unit,
+                "concurrency": self._concurrency,
+                "tasktimeout": self._tasktimeout,
+                "runtimeout": self._runtimeout,
+                "eventrefresh": self._eventrefresh,
+                "debounce": self._debounce,
+                "maxdelay": self._maxdelay,
+                "classifyttl": self._classifyttl,
+                "pathmapping": self._pathmapping,
+                "idledays": self._idledays,
+                "ratelimit": self._ratelimit,
+                "maxinflight": self._maxinflight,
+                "targets": self._targetsconf
             }
         )
 
-    def refresh(self):
+    def __build_targets(self) -> List[ZspaceTarget]:
         """
-        刷新极影视
+        构建刷新目标：插件主配置为默认目标，多极空间配置中的每一项为一个目标
         """
-        classify_list = []
-        if not self._flushall:
-            # 参数验证
-            if not self._startswith:
-                logger.error(f"网盘媒体库路径未设置")
-                return           
-            #获取days内入库的媒体
-            current_date = datetime.now()
-            if self._unit =="day":
-                target_date = current_date - timedelta(days=int(self._timescope)) 
-            elif  self._unit =="hour":    
-                target_date = current_date - timedelta(hours=int(self._timescope)) 
-            elif  self._unit =="minute":
-                target_date = current_date - timedelta(minutes=int(self._timescope)) 
-            else:
-                 logger.info(f"时间范围单位未设置")
-                 return
-            transferhistorys = TransferHistoryOper().list_by_date(target_date.strftime('%Y-%m-%d %H:%M:%S'))
-            if not transferhistorys:
-                logger.info(f"{self._timescope} {self._unit}内没有媒体库入库记录")
-                return
-            #匹配指定路径的入库数据
-            filtered_transferhistorys = [th for th in transferhistorys if th.status == 1 and th.dest is not None and th.dest.startswith(self._startswith) ]
-            if  not filtered_transferhistorys :
-                logger.info(f"{self._timescope} {self._unit}内没有网盘媒体库的记录")
-                return
-            # 提取顶级分类  电影或电视剧
-            unique_types = set([th.type for th in filtered_transferhistorys])
-            unique_categorys = set([th.category for th in filtered_transferhistorys])
-            # logger.info(f"unique_categorys: {unique_categorys}")
-            types_list =list(unique_types)
-            if "电影" in types_list:
-                moivelib_list = self._moivelib.replace("，", ",").split(",")
-                moivelib_list = list(set(moivelib_list) & unique_categorys)
-            else:
-                moivelib_list = []
-            if "电视剧" in types_list:
-                tvlib_list = self._tvlib.replace("，", ",").split(",")
-                tvlib_list = list(set(tvlib_list) & unique_categorys)
+        targets = [self.__new_target(name="", host=self._zsphost, cookie=self._zspcookie,
+                                     startswith=self._startswith, moivelib=self._moivelib,
+                                     tvlib=self._tvlib, pathmapping=self._pathmapping)]
+        if not self._targetsconf or not str(self._targetsconf).strip():
+            return targets
+        try:
+            items = json.loads(self._targetsconf)
+            if not isinstance(items, list):
+                raise ValueError("应为列表")
+        except ValueError as err:
+            logger.error(f"多极空间配置错误：{str(err)}")
+            self.systemmessage.put(f"多极空间配置错误：{err}")
+            return targets
+        names = set()
+        for item in items:
+            name = str(item.get("name") or "").strip() if isinstance(item, dict) else ""
+            if not name or name in names:
+                logger.error(f"多极空间配置错误，名称为空或重复：{item}")
+                self.systemmessage.put(f"多极空间配置错误，名称为空或重复：{name or item}")
+                continue
+            names.add(name)
+            targets.append(self.__new_target(name=name,
+                                             host=ZspaceClient.normalize_host(item.get("zsphost")),
+                                             cookie=item.get("zspcookie"),
+                                             startswith=item.get("startswith"),
+                                             moivelib=self.split_libs(item.get("moivelib")),
+                                             tvlib=self.split_libs(item.get("tvlib")),
+                                             pathmapping=item.get("pathmapping")))
+        # 只配置了多极空间时不保留空的默认目标
+        if len(targets) > 1 and not targets[0].host and not len(targets[0].path_trie):
+            targets.pop(0)
+        return targets
+
+    def __new_target(self, name: str, host: Optional[str], cookie: Optional[str], startswith: Any,
+                     moivelib: List[str], tvlib: List[str], pathmapping: Any) -> ZspaceTarget:
+        """
+        新建刷新目标，加载该目标保存的刷新状态并创建极空间接口客户端
+        """
+        target = ZspaceTarget(name=name, host=host,
+                              path_trie=self.__build_path_trie(startswith, pathmapping),
+                              movie_libs=frozenset(moivelib), tv_libs=frozenset(tvlib))
+        target.classify_state = self.get_data(target.data_key("classify_state")) or {}
+        target.journal = self.get_data(target.data_key("journal")) or {}
+        target.durations = self.get_data(target.data_key("durations")) or {}
+        # 极空间接口客户端，与同一极空间的其他插件共用连接池，cookie只在配置时解析一次
+        if host and cookie:
+            try:
+                credential = ZspaceCredential.parse(cookie, required=ZspaceCredential.MEDIA_FIELDS,
+                                                    token_keys=("zenithtoken", "token"))
+            except ValueError as err:
+                logger.error(f"极空间 {target.label} cookie配置错误：{str(err)}")
+                self.systemmessage.put(f"极空间 {target.label} cookie配置错误：{err}")
             else:
-                tvlib_list = []
-            classify_list = moivelib_list + tvlib_list
-            logger.info(f"开始刷新极影视，最近{self._timescope} {self._unit}内网盘入库媒体：{len(filtered_transferhistorys)}个,需刷新媒体库：{classify_list}")
-        # 刷新极影视
-        self.__refresh_zspmedia(classify_list)
+                target.client = ZspaceClient(host, credential,
+                                             pool_size=int(self._concurrency) + 1,
+                                             rate_limit=float(self._ratelimit),
+                                             max_inflight=int(self._maxinflight),
+                                             on_breaker_change=lambda state, message:
+                                             self.__breaker_changed(target, state, message),
+                                             cancel=self._cancel_event)
+        return target
+
+    def __fan_out(self, targets: List[ZspaceTarget], func: Callable[[ZspaceTarget], Any]):
+        """
+        各刷新目标在各自的线程中并行执行，互不等待，单个目标出错不影响其他目标
+        新线程继承当前刷新的取消标记及远程刷新任务
+        """
+        cancel = getattr(self._local, "cancel", None)
+        job = getattr(self._local, "job", None)
+
+        def _run(target: ZspaceTarget):
+            self._local.cancel = cancel
+            self._local.job = job
+            try:
+                func(target)
+            except Exception as e:
+                logger.error(f"极空间 {target.label} 刷新出错：{str(e)}")
+
+        if len(targets) == 1:
+            _run(targets[0])
+            return
+        threads = [threading.Thread(target=_run, args=(target,), name=f"zspacemediafresh-{target.label}",
+                                    daemon=True) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def refresh(self, incremental: bool = True):
+        """
+        刷新极影视，多个极空间并行刷新
+        :param incremental: 是否只处理上次刷新后新增的入库记录，并跳过没有新入库的分类
+        """
+        # 参数验证
+        targets = [target for target in self._targets if self._flushall or len(target.path_trie)]
+        if not targets:
+            logger.error(f"网盘媒体库路径未设置")
+            return
+        self.__fan_out(targets, lambda target: self.__refresh_target(target, incremental))
         logger.info(f"刷新极影视完成")
 
+    def __refresh_target(self, target: ZspaceTarget, incremental: bool):
+        """
+        刷新单个极空间
+        """
+        classify_list = []
+        watermark = None
+        # 极空间暂停请求时不查询入库记录，水位不推进，恢复后再处理
+        if target.client and not target.client.ready():
+            logger.info(f"极空间 {target.label} 暂停请求（{target.client.breaker_message()}），跳过本次刷新")
+            return
+        metrics = self.__new_metrics(target, "定时" if incremental else "手动")
+        try:
+            # 刷新全部分类时也统计入库记录，用于判断闲置分类
+            if len(target.path_trie):
+                collected = self.__collect_transfers(target, incremental, metrics)
+                if collected is None and not self._flushall:
+                    metrics["status"] = "无新入库"
+                    return
+                if collected:
+                    watermark, transfer_times = collected
+                    self.__mark_transferred(target, transfer_times)
+                    classify_list = list(transfer_times.keys())
+            # 刷新极影视
+            if self.__refresh_zspmedia(target, classify_list, force=not incremental, metrics=metrics) and watermark:
+                # 刷新成功后推进水位，失败时下次重新处理；各极空间的水位分开记录
+                self.save_data(target.data_key("watermark"), watermark)
+        finally:
+            self.__save_metrics(target, metrics)
+
+    def __collect_transfers(self, target: ZspaceTarget, incremental: bool,
+                            metrics: Dict[str, Any]) -> Optional[Tuple[Optional[dict], Dict[str, float]]]:
+        """
+        查询时间范围内网盘媒体库的入库记录，路由需刷新的极影视分类
+        :return: (新水位, {分类名: 最近入库时间})，没有新的网盘入库记录时水位之外返回空
+        """
+        #获取days内入库的媒体
+        current_date = datetime.now()
+        if self._unit =="day":
+            target_date = current_date - timedelta(days=int(self._timescope)) 
+        elif  self._unit =="hour":    
+            target_date = current_date - timedelta(hours=int(self._timescope)) 
+        elif  self._unit =="minute":
+            target_date = current_date - timedelta(minutes=int(self._timescope)) 
+        else:
+             logger.info(f"时间范围单位未设置")
+             return None
+        query_date = target_date.strftime('%Y-%m-%d %H:%M:%S')
+        # 已处理到的入库记录水位，只查询水位之后的记录
+        last_watermark = (self.get_data(target.data_key("watermark")) or {}) if incremental else {}
+        if last_watermark.get("date"):
+            # 同一秒内可能有多条记录，回退1秒后再按ID过滤
+            watermark_date = (datetime.strptime(last_watermark["date"], '%Y-%m-%d %H:%M:%S')
+                              - timedelta(seconds=1)).strftime('%Y-%m-%d %H:%M:%S')
+            query_date = max(query_date, watermark_date)
+        stage_time = time.time()
+        summary = summarize_transfers(query_date, last_watermark.get("id"), target.path_trie.prefixes())
+        stage_time = self.__record_stage(metrics, "history_query", stage_time)
+        if not summary.latest:
+            logger.info(f"{self._timescope} {self._unit}内没有新的媒体库入库记录")
+            return None
+        watermark = {"id": summary.latest[0], "date": summary.latest[1]}
+        #按网盘路径及 顶级分类(电影或电视剧)+二级分类 路由需刷新的极影视分类
+        matched_count = 0
+        transfer_times: Dict[str, float] = {}
+        for group in summary.groups:
+            classifies = self.__resolve_route(target, target.path_trie.get(group.root), group.type, group.category)
+            matched_count += group.count
+            transfer_time = datetime.strptime(group.last_date, '%Y-%m-%d %H:%M:%S').timestamp()
+            for classify in classifies:
+                transfer_times[classify] = max(transfer_times.get(classify, 0), transfer_time)
+        self.__record_stage(metrics, "history_filter", stage_time)
+        metrics["rows"] = summary.total
+        metrics["matched"] = matched_count
+        if not matched_count:
+            logger.info(f"{self._timescope} {self._unit}内没有新的网盘媒体库记录：{target.label}")
+            self.save_data(target.data_key("watermark"), watermark)
+            return None
+        logger.info(f"开始刷新极影视 {target.label}，最近{self._timescope} {self._unit}内网盘入库媒体：{matched_count}个,需刷新媒体库：{list(transfer_times.keys())}")
+        return watermark, transfer_times
+
+    def __mark_transferred(self, target: ZspaceTarget, transfer_times: Dict[str, float]):
+        """
+        记录分类最近入库时间
+        """
+        if not transfer_times:
+            return
+        with self._state_lock:
+            for classify, transfer_time in transfer_times.items():
+                state = target.classify_state.setdefault(classify, {})
+                state["last_transfer"] = max(state.get("last_transfer") or 0, transfer_time)
+            self.save_data(target.data_key("classify_state"), target.classify_state)
+
+    def __mark_rescanned(self, target: ZspaceTarget, classify: str, start_time: float, end_time: float):
+        """
+        记录分类最近一次刷新成功的提交及完成时间
+        """
+        with self._state_lock:
+            state = target.classify_state.setdefault(classify, {})
+            state["last_rescan"] = start_time
+            state["last_rescan_end"] = end_time
+            self.save_data(target.data_key("classify_state"), target.classify_state)
+
+    def __filter_dirty(self, target: ZspaceTarget, pending_list: List[str]) -> List[str]:
+        """
+        跳过上次刷新后没有新入库的分类
+        刷新全部分类时，闲置期内没有入库且闲置期内已刷新过的分类跳过
+        """
+        now = time.time()
+        idle_seconds = float(self._idledays or 0) * 24 * 60 * 60
+        dirty_list = []
+        for classify in pending_list:
+            state = target.classify_state.get(classify) or {}
+            last_transfer = state.get("last_transfer") or 0
+            last_rescan = state.get("last_rescan") or 0
+            if last_rescan and last_transfer < last_rescan:
+                if not self._flushall:
+                    logger.info(f"分类 {classify} 上次刷新后没有新入库，跳过刷新")
+                    continue
+                if idle_seconds and now - last_transfer >= idle_seconds and now - last_rescan < idle_seconds:
+                    logger.info(f"分类 {classify} 闲置中，跳过刷新")
+                    continue
+            dirty_list.append(classify)
+        return dirty_list
+
+    def __build_path_trie(self, startswith: Any, pathmapping: Any) -> PathTrie:
+        """
+        构建入库路径路由：网盘媒体库路径按电影/电视剧分类名匹配，路径映射直接指定分类
+        :param startswith: 网盘媒体库路径，多极空间配置中可为列表
+        :param pathmapping: 路径映射，每行一个，多极空间配置中可为列表
+        """
+        trie = PathTrie()
+        for path in (startswith if isinstance(startswith, list) else [startswith]):
+            if path and str(path).strip():
+                trie.insert(str(path).strip())
+        lines = pathmapping if isinstance(pathmapping, list) else (pathmapping or "").splitlines()
+        for line in lines:
+            line = str(line).strip()
+            if not line:
+                continue
+            if "#" not in line:
+                logger.error(f"路径映射配置错误，缺少分类：{line}")
+                continue
+            path, libs = line.split("#", 1)
+            libs = self.split_libs(libs)
+            if not path.strip() or not libs:
+                logger.error(f"路径映射配置错误：{line}")
+                continue
+            trie.insert(path.strip(), frozenset(libs))
+        return trie
+
+    def __route_classifies(self, target: ZspaceTarget, dest: Optional[str], mtype: str,
+                           category: str) -> Optional[List[str]]:
+        """
+        根据入库路径、MP媒体类型及二级分类路由极影视分类
+        :return: 需刷新的分类，路径不在该极空间的网盘媒体库中返回None
+        """
+        matched = target.path_trie.match(dest)
+        if not matched:
+            return None
+        return self.__resolve_route(target, matched[1], mtype, category)
+
+    @staticmethod
+    def __resolve_route(target: ZspaceTarget, classifies: Optional[frozenset], mtype: str,
+                        category: str) -> List[str]:
+        """
+        根路径指定了分类时直接使用，否则按MP媒体类型及二级分类匹配电影/电视剧分类名
+        """
+        if classifies is not None:
+            return list(classifies)
+        if mtype == "电影":
+            libs = target.movie_libs
+        elif mtype == "电视剧":
+            libs = target.tv_libs
+        else:
+            return []
+        return [category] if category in libs else []
+
+    @staticmethod
+    def split_libs(libs: Any) -> List[str]:
+        """
+        分类配置兼容逗号分隔字符串及列表
+        """
+        if not libs:
+            return []
+        if isinstance(libs, str):
+            libs = libs.replace("，", ",").split(",")
+        return [lib.strip() for lib in libs if lib and lib.strip()]
+
+    @staticmethod
+    def __config_number(value: Any, default: float) -> float:
+        """
+        数值配置，允许配置为0，未配置或格式错误时使用默认值
+        """
+        if value is None or str(value).strip() == "":
+            return default
+        try:
+            return max(float(value), 0)
+        except (TypeError, ValueError):
+            logger.warning(f"配置项 {value} 不是数字，使用默认值 {default}")
+            return default
+
+    @eventmanager.register(EventType.TransferComplete)
+    def transfer_completed(self, event: Event):
+        """
+        入库完成后延迟合并刷新对应分类，入库路径可能同时属于多个极空间
+        """
+        if not self._enabled or not self._eventrefresh or not self._scheduler:
+            return
+        event_data = event.event_data or {}
+        transferinfo = event_data.get("transferinfo")
+        mediainfo = event_data.get("mediainfo")
+        if not transferinfo or not mediainfo or not getattr(transferinfo, "success", True):
+            return
+        target_item = getattr(transferinfo, "target_item", None) or getattr(transferinfo, "target_diritem", None)
+        dest = target_item.path if target_item else None
+        routed = {}
+        for target in self._targets:
+            classifies = self.__route_classifies(target, dest, mediainfo.type.value if mediainfo.type else None,
+                                                 mediainfo.category)
+            if classifies is None or (not classifies and not self._flushall):
+                continue
+            self.__mark_transferred(target, {classify: time.time() for classify in classifies})
+            routed[target.label] = classifies
+        if not routed:
+            return
+        with self._pending_lock:
+            now = time.time()
+            if not self._pending_since:
+                self._pending_since = now
+            for target in self._targets:
+                if target.label in routed:
+                    if target.pending_classifies is None:
+                        target.pending_classifies = set()
+                    target.pending_classifies.update(routed[target.label])
+            # 静默期内有新入库则顺延，但不超过最大延迟
+            run_time = min(now + int(self._debounce), self._pending_since + int(self._maxdelay))
+            self._scheduler.add_job(self.__queue_refresh, 'date',
+                                    run_date=datetime.fromtimestamp(run_time, tz=pytz.timezone(settings.TZ)),
+                                    kwargs={"event": True},
+                                    id="zspacemediafresh_event", replace_existing=True,
+                                    name="极影视入库刷新")
+        logger.debug(f"入库触发刷新：{dest}，待刷新分类：{routed}")
+
+    def __flush_pending(self):
+        """
+        合并刷新入库事件积累的分类，多个极空间并行刷新
+        """
+        pending: Dict[str, List[str]] = {}
+        with self._pending_lock:
+            for target in self._targets:
+                if target.pending_classifies is not None:
+                    pending[target.label] = list(target.pending_classifies)
+                target.pending_classifies = None
+            self._pending_since = None
+        targets = [target for target in self._targets if target.label in pending]
+        if targets:
+            self.__fan_out(targets, lambda target: self.__flush_target(target, pending[target.label]))
+
+    def __flush_target(self, target: ZspaceTarget, classify_list: List[str]):
+        """
+        刷新单个极空间入库事件积累的分类
+        """
+        logger.info(f"开始刷新极影视 {target.label}，入库触发，需刷新媒体库：{classify_list}")
+        metrics = self.__new_metrics(target, "入库")
+        try:
+            self.__refresh_zspmedia(target, classify_list, metrics=metrics)
+        finally:
+            self.__save_metrics(target, metrics)
+        logger.info(f"刷新极影视 {target.label} 完成")
+
     @eventmanager.register(EventType.PluginAction)
     def remote_sync(self, event: Event):
         """
-        远程刷新媒体库
+        远程刷新媒体库，提交刷新任务后立即返回，完成后通知
         """
+        channel = userid = None
         if event:
             event_data = event.event_data
             if not event_data or event_data.get("action") != "zsp_media_refresh":
                 return
-            self.post_message(channel=event.event_data.get("channel"),
-                              title="开始刷新极影视 ...",
-                              userid=event.event_data.get("user"))
-        self.refresh()
+            channel = event_data.get("channel")
+            userid = event_data.get("user")
+        job, joined = self.submit_job(channel=channel, userid=userid)
         if event:
-            self.post_message(channel=event.event_data.get("channel"),
-                              title="刷新极影视完成！", userid=event.event_data.get("user"))
+            if joined:
+                title = f"极影视刷新任务 {job['id']} {job['status']}，完成后通知"
+            else:
+                title = f"开始刷新极影视 ...任务ID：{job['id']}"
+            self.post_message(channel=channel, title=title,
+                              text="发送 /zsp_media_progress 查看刷新进度", userid=userid)
 
-    def __refresh_zspmedia(self,classify_list):
+    @eventmanager.register(EventType.PluginAction)
+    def remote_progress(self, event: Event):
         """
-        刷新极影视
+        远程查询刷新进度
         """
+        event_data = event.event_data if event else None
+        if not event_data or event_data.get("action") != "zsp_media_progress":
+            return
+        job = self.get_job()
+        if not job:
+            self.post_message(channel=event_data.get("channel"), title="没有极影视刷新任务",
+                              userid=event_data.get("user"))
+            return
+        self.post_message(channel=event_data.get("channel"),
+                          title=f"极影视刷新任务 {job['id']} {job['status']}",
+                          text=self.__job_text(job), userid=event_data.get("user"))
 
-        # logger.info(f"_zsphost ：{self._zsphost}")
-        # logger.info(f"_zspcookie ：{self._zspcookie}")
+    def submit_job(self, channel: Any = None, userid: Any = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        提交远程刷新任务，已有排队或进行中的任务时加入该任务
+        :param channel: 完成后通知的渠道
+        :param userid: 完成后通知的用户
+        :return: (任务快照, 是否加入已有任务)
+        """
+        with self._job_lock:
+            job = next((job for job in self._jobs.values() if job["status"] in ("排队中", "进行中")), None)
+            joined = job is not None
+            if not joined:
+                job = {"id": uuid.uuid4().hex[:8], "status": "排队中", "result": None,
+                       "created": time.time(), "started": None, "finished": None,
+                       "classifies": {}, "waiters": []}
+                self._jobs[job["id"]] = job
+                for job_id in list(self._jobs.keys())[:-self._jobs_keep]:
+                    self._jobs.pop(job_id)
+            if channel or userid:
+                job["waiters"].append({"channel": channel, "userid": userid})
+        if joined:
+            logger.info(f"极影视刷新任务 {job['id']} {job['status']}，加入该任务")
+        else:
+            self.__queue_refresh(incremental=False, job_id=job["id"])
+        return self.__job_snapshot(job), joined
 
-        if not self._zsphost or not self._zspcookie:
-            logger.error("极空间主机地址或cookie未配置")
-            return False
+    def get_job(self, job_id: str = None) -> Optional[Dict[str, Any]]:
+        """
+        API：刷新任务进度，未指定任务ID时返回最近的任务
+        """
+        with self._job_lock:
+            job = self._jobs.get(job_id) if job_id else next(reversed(list(self._jobs.values())), None)
+        return self.__job_snapshot(job) if job else None
+
+    def __job_snapshot(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        任务进度快照，时间转为可读格式并计算进行中分类的已用时间
+        """
+        def _time(value: Optional[float]) -> Optional[str]:
+            return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(value)) if value else None
 
-        # logger.info(f"cookie parse start")
+        now = time.time()
+        with self._job_lock:
+            classifies = []
+            for name, progress in job["classifies"].items():
+                item = {"name": name, **progress}
+                if item.get("duration") is None and item.get("start"):
+                    item["elapsed"] = round(now - item["start"], 1)
+                item["start"] = _time(item.get("start"))
+                classifies.append(item)
+            end = job["finished"] or now
+            return {"id": job["id"], "status": job["status"], "result": job["result"],
+                    "created": _time(job["created"]), "started": _time(job["started"]),
+                    "finished": _time(job["finished"]),
+                    "elapsed": round(end - job["started"], 1) if job["started"] else None,
+                    "classifies": classifies}
+
+    @staticmethod
+    def __job_text(job: Dict[str, Any]) -> str:
+        """
+        任务进度通知文本
+        """
+        lines = []
+        if job.get("elapsed") is not None:
+            lines.append(f"已用时：{int(job['elapsed'])} 秒")
+        if job.get("result"):
+            lines.append(f"结果：{job['result']}")
+        for item in job["classifies"]:
+            line = f"分类：{item['name']} {item.get('status')}"
+            if item.get("duration") is not None:
+                line += f"，用时 {int(item['duration'])} 秒"
+            elif item.get("elapsed") is not None:
+                line += f"，已用时 {int(item['elapsed'])} 秒"
+            if item.get("polls"):
+                line += f"，查询 {item['polls']} 次"
+            lines.append(line)
+        if not job["classifies"] and job["status"] == "进行中":
+            lines.append("正在查询入库记录及极影视分类")
+        return "\n".join(lines)
+
+    def __update_job(self, job: Optional[Dict[str, Any]], **fields):
+        """
+        更新任务状态
+        """
+        if not job:
+            return
+        with self._job_lock:
+            job.update(fields)
+
+    def __update_progress(self, target: ZspaceTarget, classify: str, **fields):
+        """
+        更新当前刷新任务中分类的进度，不是远程刷新任务时忽略
+        """
+        job = getattr(self._local, "job", None)
+        if not job:
+            return
+        with self._job_lock:
+            job["classifies"].setdefault(self.__classify_label(target, classify), {}).update(fields)
+
+    def __classify_label(self, target: ZspaceTarget, classify: str) -> str:
+        """
+        通知及进度中的分类名，有多个极空间时加上极空间名称
+        """
+        return f"{target.label}/{classify}" if len(self._targets) > 1 else classify
+
+    def __finish_job(self, job: Optional[Dict[str, Any]], cancelled: bool = False):
+        """
+        任务结束，通知提交及加入任务的渠道
+        """
+        if not job:
+            return
+        self.__update_job(job, status="已取消" if cancelled else "完成", finished=time.time())
+        snapshot = self.__job_snapshot(job)
+        for waiter in job["waiters"]:
+            self.post_message(channel=waiter["channel"], title=f"刷新极影视{snapshot['status']}！任务ID：{job['id']}",
+                              text=self.__job_text(snapshot), userid=waiter["userid"])
+
+    def __refresh_zspmedia(self, target: ZspaceTarget, classify_list, force: bool = False,
+                           metrics: Dict[str, Any] = None):
+        """
+        刷新极影视
+        :param target: 刷新的极空间
+        :param force: 不跳过没有新入库的分类
+        :param metrics: 本次运行数据
+        """
+        if metrics is None:
+            metrics = self.__new_metrics(target, "手动")
+
+        if not target.client:
+            logger.error(f"极空间 {target.label} 主机地址或cookie未配置")
+            metrics["status"] = "未配置"
+            return False
+        if not target.client.ready():
+            logger.info(f"极空间 {target.label} 暂停请求（{target.client.breaker_message()}），跳过本次刷新")
+            metrics["status"] = "极空间暂停请求"
+            return False
 
         try:
-            cookie = cookie_parse(self._zspcookie)
-            # logger.info(f"cookie解析成功：{cookie}")
+            # 获取分类ID
+            stage_time = time.time()
+            name_id_dict = self.__get_classifications(target)
+            # 有未知分类时重新获取，可能是新建的分类；重新获取后仍不存在的分类在缓存有效期内不再重新获取
+            unknown_list = [classify for classify in classify_list if classify not in name_id_dict] \
+                if name_id_dict and not self._flushall else []
+            if unknown_list and not self.__known_missing(target, unknown_list):
+                name_id_dict = self.__get_classifications(target, force=True)
+                if name_id_dict:
+                    self.__remember_missing(target, [classify for classify in unknown_list
+                                                     if classify not in name_id_dict])
+            stage_time = self.__record_stage(metrics, "classification_list", stage_time)
+            if not name_id_dict:
+                metrics["status"] = "获取分类失败"
+                return False
+            # 是否全类型刷新
+            if self._flushall :
+                    classify_list = list(name_id_dict.keys())
+            pending_list = []
+            for classify in classify_list:
+                if classify not in name_id_dict:
+                    logger.info(f"分类 {classify} 不存在于极影视分类列表中，跳过刷新")
+                    continue
+                if classify not in pending_list:
+                    pending_list.append(classify)
+            if not force:
+                pending_list = self.__filter_dirty(target, pending_list)
+            total_msgtext = self.__rescan_all(target, pending_list, name_id_dict, metrics)
+            self.__record_stage(metrics, "rescan", stage_time)
+            if self.__cancelled():
+                logger.info(f"极影视刷新已取消")
+                metrics["status"] = "已取消"
+                return False
+            if not target.client.available:
+                metrics["status"] = "极空间暂停请求"
+                return False
+            if self._notifyaggregation and self._notify and total_msgtext:
+                self.post_message(
+                        mtype=NotificationType.Plugin,
+                        title="【刷新极影视】",
+                        text=total_msgtext)
+            if metrics["status"]:
+                # 本轮刷新超时或部分分类未完成，入库水位不推进，下次重新处理
+                return False
+            metrics["status"] = "完成"
+            return True
         except Exception as e:
-            logger.error(f"cookie解析失败：{str(e)}")
+            logger.error(f"极影视 {target.label} 刷新出错：" + str(e))
+            metrics["status"] = f"出错：{str(e)}"
             return False
 
-        # 检查必要的cookie字段
-        required_fields = ['zenithtoken', 'device_id', 'device', 'version', '_l', 'nas_id']
-        missing_fields = []
-        for field in required_fields:
-            if field not in cookie:
-                missing_fields.append(field)
-        
-        if missing_fields:
-            logger.error(f"cookie中缺少必要字段：{missing_fields}")
-            return False
+    def __get_classifications(self, target: ZspaceTarget, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        获取极影视分类 名称->ID，缓存有效期内不请求接口
+        :param force: 忽略缓存重新获取
+        """
+        cache = self.__classify_cache(target)
+        if not force and cache.get("items") and cache.get("host") == target.host \
+                and time.time() - cache.get("time", 0) < int(self._classifyttl) * 60:
+            return cache["items"]
+        if not target.client:
+            return None
+        try:
+            items = target.client.classifications()
+        except ZspaceError as e:
+            logger.info(f"极影视 {target.label} 获取分类列表出错：{str(e)}")
+            return None
+        logger.debug(f"获取极影视 {target.label} 分类 ：{items}")
+        if not items:
+            return None
+        # 保留仍不存在的分类的记录
+        missing = {name: missing_time for name, missing_time in (cache.get("missing") or {}).items()
+                   if name not in items} if cache.get("host") == target.host else {}
+        target.classify_cache = {"host": target.host, "time": time.time(), "items": items, "missing": missing}
+        self.save_data(target.data_key("classifications"), target.classify_cache)
+        return items
 
-        # 传入 HTTP 前对 cookie 进行编码
-        zspcookie_encoded = quote(self._zspcookie, safe='=; ')
-
-        token = cookie['zenithtoken']
-        # logger.info(f"token ：{token}")
-        device_id = cookie['device_id']
-        # logger.info(f"device_id ：{device_id}")
-        device = cookie['device']
-        # logger.info(f"device ：{device}")
-        version = cookie['version']
-        # logger.info(f"version ：{version}")
-        _l = cookie['_l']
-        # logger.info(f"_l ：{_l}")
-        nasid = cookie['nas_id']
-        # logger.info(f"nasid ：{nasid}")
-
-        msgtext= None
+    def __known_missing(self, target: ZspaceTarget, classify_list: List[str]) -> bool:
+        """
+        分类均在缓存有效期内确认过不存在
+        """
+        missing = self.__classify_cache(target).get("missing") or {}
+        now = time.time()
+        return all(now - missing.get(classify, 0) < int(self._classifyttl) * 60 for classify in classify_list)
+
+    def __remember_missing(self, target: ZspaceTarget, classify_list: List[str]):
+        """
+        记录重新获取后仍不存在的分类，清理过期的记录
+        """
+        cache = self.__classify_cache(target)
+        now = time.time()
+        missing = {name: missing_time for name, missing_time in (cache.get("missing") or {}).items()
+                   if now - missing_time < int(self._classifyttl) * 60}
+        missing.update({classify: now for classify in classify_list})
+        cache["missing"] = missing
+        self.save_data(target.data_key("classifications"), cache)
+
+    def __classify_cache(self, target: ZspaceTarget) -> Dict[str, Any]:
+        """
+        目标的分类缓存，首次使用时从插件数据加载
+        """
+        if target.classify_cache is None:
+            target.classify_cache = self.get_data(target.data_key("classifications")) or {}
+        return target.classify_cache
+
+    def __expire_classifications(self, target: ZspaceTarget):
+        """
+        分类缓存失效，下次刷新重新获取
+        """
+        if target.classify_cache:
+            target.classify_cache["time"] = 0
+            self.save_data(target.data_key("classifications"), target.classify_cache)
+
+    def __rescan_all(self, target: ZspaceTarget, pending_list: List[str], name_id_dict: Dict[str, Any], metrics: Dict[str, Any]) -> str:
+        """
+        并发提交分类刷新，单个轮询器统一查询所有进行中的任务
+        有历史耗时的分类按预计耗时从长到短提交，预计完成前不查询，预计完成附近密集查询；
+        没有历史耗时或超过p90耗时后，轮询间隔指数退避（带抖动），上限为等待时间；单任务与整轮刷新均有超时
+        整轮刷新超时时运行状态记为本轮刷新超时，有分类提交失败或单任务超时时记为部分分类未完成
+        :return: 聚合通知文本
+        """
         total_msgtext = ""
+        concurrency = max(int(self._concurrency or 1), 1)
+        max_interval = max(int(self._waittime), self._poll_min_interval)
+        task_timeout = int(self._tasktimeout) * 60
+        run_deadline = time.time() + int(self._runtimeout) * 60
+        waiting = list(pending_list)
+        # 进行中的任务 task_id -> {"classify": 分类名, "classification_id": 分类ID, "start_time": 开始时间,
+        #                          "interval": 当前轮询间隔, "next_poll": 下次轮询时间, "estimate": (EWMA, p90)}
+        running: Dict[str, Dict[str, Any]] = {}
+        # 已在刷新中的分类（重启前提交或上一轮未等到结束）不重复提交，继续查询原任务
+        journal = self.__journal_entries(target)
+        for classify in list(waiting):
+            entry = journal.get(classify)
+            if not entry:
+                continue
+            waiting.remove(classify)
+            logger.info(f"分类：{classify} 已在刷新中，继续查询任务：{entry['task_id']}")
+            now = time.time()
+            self.__update_progress(target, classify, status="刷新中", start=entry["submit_time"], task_id=entry["task_id"])
+            running[entry["task_id"]] = {"classify": classify, "classification_id": entry["classification_id"],
+                                         "start_time": entry["submit_time"], "interval": self._poll_min_interval,
+                                         "next_poll": now, "polls": 0, "estimate": self.__estimate(target, classify)}
+        # 耗时最长的分类最先提交，没有历史耗时的分类视为最长
+        waiting.sort(key=lambda name: -(self.__estimate(target, name) or (math.inf,))[0])
+        for classify in waiting:
+            self.__update_progress(target, classify, status="等待")
+        while (waiting or running) and not self.__cancelled():
+            # 极空间无法连接或登录失效，剩余任务不再等待
+            if not target.client.available:
+                for task_id, task in running.items():
+                    total_msgtext += self.__report_task(target, task, "极空间暂停请求", metrics)
+                for classify in waiting:
+                    total_msgtext += self.__report_task(target, {"classify": classify}, "极空间暂停请求，未提交", metrics)
+                break
+            # 补足并发数，提交刷新请求
+            while waiting and len(running) < concurrency and time.time() < run_deadline:
+                classify = waiting.pop(0)
+                classification_id = name_id_dict[classify]
+                task_id = self.__submit_rescan(target, classify, classification_id)
+                if not task_id:
+                    metrics["status"] = metrics["status"] or "部分分类未完成"
+                    total_msgtext += self.__report_task(target, {"classify": classify}, "提交失败", metrics)
+                if task_id:
+                    now = time.time()
+                    self.__journal_add(target, classify, task_id, classification_id, now)
+                    self.__update_progress(target, classify, status="刷新中", start=now, task_id=task_id)
+                    running[task_id] = {"classify": classify, "classification_id": classification_id,
+                                        "start_time": now,
+                                        "interval": self._poll_min_interval,
+                                        "next_poll": now + self._poll_min_interval, "polls": 0,
+                                        "estimate": self.__estimate(target, classify)}
+                    if running[task_id]["estimate"]:
+                        self.__schedule_poll(running[task_id], now, max_interval)
+            # 整轮刷新超时，剩余任务不再等待，未提交的分类同样记录；本轮未完成，入库水位不推进
+            if time.time() >= run_deadline:
+                metrics["status"] = "本轮刷新超时"
+                for task_id, task in running.items():
+                    logger.warning(f"分类：{task['classify']} 刷新超过本轮时限，停止等待，task_id：{task_id}")
+                    total_msgtext += self.__report_task(target, task, "本轮刷新超时", metrics)
+                for classify in waiting:
+                    logger.warning(f"分类：{classify} 本轮刷新超时，未提交刷新")
+                    total_msgtext += self.__report_task(target, {"classify": classify}, "本轮刷新超时，未提交", metrics)
+                break
+            if not running:
+                break
+            # 等待最早需要轮询的任务
+            wait_seconds = min(task["next_poll"] for task in running.values()) - time.time()
+            if wait_seconds > 0:
+                if self.__sleep(min(wait_seconds, max(run_deadline - time.time(), 0))):
+                    break
+            # 轮询到期的任务
+            for task_id, task in list(running.items()):
+                now = time.time()
+                if task["next_poll"] > now:
+                    continue
+                if self.__cancelled():
+                    break
+                classify = task["classify"]
+                task["polls"] += 1
+                self.__update_progress(target, classify, polls=task["polls"])
+                try:
+                    status = target.client.rescan_status(task["classification_id"], task_id)
+                    logger.debug(f"获取刷新结果 {classify}：{status}")
+                except ZspaceError as e:
+                    logger.error(f"分类：{classify} 获取刷新结果出错，task_id：{task_id}，{str(e)}")
+                    status = None
+                if status and status.finished:
+                    running.pop(task_id)
+                    logger.info(f"分类：{classify} 刷新任务执行结束,task_id：{task_id}，task_status:{status.task_status}")
+                    self.__journal_remove(target, classify)
+                    self.__record_duration(target, classify, now - task["start_time"])
+                    self.__mark_rescanned(target, classify, task["start_time"], now)
+                    total_msgtext += self.__report_task(target, task, "刷新成功", metrics)
+                elif now - task["start_time"] >= task_timeout:
+                    running.pop(task_id)
+                    self.__journal_remove(target, classify)
+                    logger.warning(f"分类：{classify} 刷新超过{self._tasktimeout}分钟未完成，停止等待，task_id：{task_id}")
+                    metrics["status"] = metrics["status"] or "部分分类未完成"
+                    total_msgtext += self.__report_task(target, task, "刷新超时", metrics)
+                else:
+                    self.__schedule_poll(task, now, max_interval)
+                    logger.debug(f"分类：{classify} 刷新执行中,{int(task['next_poll'] - now)}秒后再次查询，task_id：{task_id}")
+        return total_msgtext
 
-        # 获取分类列表
-        list_url = "%s/zvideo/classification/list?&rnd=%s&webagent=v2" % (self._zsphost, self.generate_string() )
-        # logger.info(f"获取极影视分类URL ：{list_url}")
+    def __schedule_poll(self, task: Dict[str, Any], now: float, max_interval: float):
+        """
+        计算任务下次轮询时间
+        预计完成(EWMA的0.9倍)前不查询；预计完成到p90之间约查询3次；之后或没有历史耗时时指数退避
+        """
+        estimate = task.get("estimate")
+        elapsed = now - task["start_time"]
+        if estimate:
+            ewma, p90 = estimate
+            expected = ewma * 0.9
+            if elapsed < expected:
+                task["next_poll"] = task["start_time"] + max(expected, self._poll_min_interval)
+                return
+            if elapsed < p90:
+                task["interval"] = min(max((p90 - expected) / 3, self._poll_min_interval), max_interval)
+                task["next_poll"] = now + task["interval"] * random.uniform(0.8, 1.2)
+                return
+        # 指数退避 + 抖动
+        task["interval"] = min(task["interval"] * self._poll_backoff, max_interval)
+        task["next_poll"] = now + task["interval"] * random.uniform(0.8, 1.2)
 
-        try:
-            # logger.info(f"获取极影视分类cookies ：{self._zspcookie}")
-
-            rsp_body=RequestUtils(cookies=zspcookie_encoded).post_res(list_url)
-            logger.info(f"获取极影视分类rsp_body ：{rsp_body}")
-
-            res = rsp_body.json()
-            logger.debug(f"获取极影视分类 ：{res}")
-            if res and res["code"] == "200":
-                if res["data"] and isinstance(res["data"], list):
-                    # 获取分类ID
-                    name_id_dict = {item["name"]: item["id"] for item in res['data']}
-                    # 是否全类型刷新
-                    if self._flushall :
-                            classify_list = [item["name"] for item in res['data']]
-                    for classify in classify_list:
-                        if classify not in name_id_dict:
-                            logger.info(f"分类 {classify} 不存在于极影视分类列表中，跳过刷新")
-                            continue
-                        # 提交刷新请求
-                        rescan_url = "%s/zvideo/classification/rescan?&rnd=%s&webagent=v2" % (self._zsphost, self.generate_string())
-                        formdata = {"classification_id": name_id_dict[classify],"device_id":device_id,"token":token,"device":device,"plat":"web","_l":_l,"version":version,"nasid":nasid}
-                        rescanres = RequestUtils(headers={"Content-Type": "application/x-www-form-urlencoded"},cookies=zspcookie_encoded).post_res(rescan_url,formdata)
-                        logger.info(f"提交刷新rescanres resp：{rsp_body}")
-                        rescanres_json = rescanres.json()
-                        logger.debug(f"提交刷新请求--rescanres_json：{rescanres_json}")
-                        start_time = time.time()# 记录开始时间
-                        if rescanres_json["code"] =="200" and rescanres_json["data"]["task_id"]:
-                            logger.info(f"分类：{classify}开始刷新，任务ID：{rescanres_json['data']['task_id']}")
-                            # 查询刷新结果
-                            result_url = "%s/zvideo/classification/rescan/result?&rnd=%s&webagent=v2" % (self._zsphost,self.generate_string())
-                            formdata["task_id"] = rescanres_json['data']['task_id']
-                            logger.debug(f"返回数据-----》：{formdata}")
-                            while True:
-                                #轮询状态
-                                resultRep = RequestUtils(headers={"Content-Type": "application/x-www-form-urlencoded"},
-                                                        cookies=zspcookie_encoded).post_res(result_url, formdata)
-                                logger.info(f"获取刷新结果 resultRep：{resultRep}")
-
-                                result_json = resultRep.json()
-                                if result_json and result_json["code"] in ["200","N120024"] and result_json["data"]["task_status"] != 2:
-                                    logger.info(f"分类：{classify} 刷新执行中,等待{self._waittime}秒，task_id：{rescanres_json['data']['task_id']}")
-                                    time.sleep(int(self._waittime))  #任务状态进行中 等待
-                                else:
-                                    logger.info(f"分类：{classify} 刷新任务执行结束,task_id：{rescanres_json['data']['task_id']}，task_status:{result_json['data']['task_status']}")
-                                    end_time = time.time()  # 记录结束时间
-                                    msgtext =f"分类：{classify} 刷新成功\n"+f"开始时间： {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))}\n"+f"用时： {int(end_time - start_time)} 秒\n"
-                                    if not self._notifyaggregation and self._notify:
-                                        self.post_message(
-                                            mtype=NotificationType.Plugin,
-                                            title="【刷新极影视】",
-                                            text= msgtext)
-                                    elif self._notifyaggregation and self._notify :
-                                        total_msgtext += msgtext
-                                    break
-                        else:
-                            logger.info(f"极影视获取分类列表出错：{rescanres_json}")
-                    if  self._notifyaggregation and self._notify:
-                        self.post_message(
-                                mtype=NotificationType.Plugin,
-                                title="【刷新极影视】",
-                                text=total_msgtext)
+    def __estimate(self, target: ZspaceTarget, classify: str) -> Optional[Tuple[float, float]]:
+        """
+        分类预计刷新耗时
+        :return: (EWMA, p90)，没有历史耗时返回None
+        """
+        model = target.durations.get(classify)
+        if not model or not model.get("samples"):
+            return None
+        samples = sorted(model["samples"])
+        p90 = samples[max(math.ceil(len(samples) * 0.9) - 1, 0)]
+        return model["ewma"], max(p90, model["ewma"])
+
+    def __record_duration(self, target: ZspaceTarget, classify: str, seconds: float):
+        """
+        分类刷新成功后更新耗时模型
+        """
+        seconds = round(seconds, 1)
+        with self._state_lock:
+            model = target.durations.get(classify)
+            if not model:
+                model = target.durations[classify] = {"ewma": seconds, "samples": []}
             else:
-                logger.info(f"极影视获取分类列表出错：{res}")
+                model["ewma"] = round(self._duration_alpha * seconds + (1 - self._duration_alpha) * model["ewma"], 1)
+            model["samples"] = (model["samples"] + [seconds])[-self._duration_samples:]
+            self.save_data(target.data_key("durations"), target.durations)
+
+    def __journal_entries(self, target: ZspaceTarget) -> Dict[str, Dict[str, Any]]:
+        """
+        当前极空间未超时的刷新任务，顺带清理其他地址及已超时的记录
+        """
+        task_timeout = int(self._tasktimeout or 60) * 60
+        now = time.time()
+        with self._state_lock:
+            entries = {classify: entry for classify, entry in target.journal.items()
+                       if entry.get("host") == target.host and now - entry.get("submit_time", 0) < task_timeout}
+            if len(entries) != len(target.journal):
+                target.journal = entries
+                self.save_data(target.data_key("journal"), entries)
+            return dict(entries)
+
+    def __journal_add(self, target: ZspaceTarget, classify: str, task_id: str, classification_id: Any, submit_time: float):
+        """
+        记录已提交的刷新任务
+        """
+        with self._state_lock:
+            target.journal[classify] = {"task_id": task_id, "classification_id": classification_id,
+                                       "submit_time": submit_time, "host": target.host}
+            self.save_data(target.data_key("journal"), target.journal)
+
+    def __journal_remove(self, target: ZspaceTarget, classify: str):
+        """
+        刷新任务完成或超时，不再继续查询
+        """
+        with self._state_lock:
+            if target.journal.pop(classify, None) is not None:
+                self.save_data(target.data_key("journal"), target.journal)
+
+    def __resume_journal(self):
+        """
+        继续查询重启前未完成的刷新任务，多个极空间并行查询
+        """
+        targets = [target for target in self._targets if target.client and self.__journal_entries(target)]
+        if targets:
+            self.__fan_out(targets, self.__resume_target)
+
+    def __resume_target(self, target: ZspaceTarget):
+        """
+        继续查询单个极空间未完成的刷新任务
+        """
+        entries = self.__journal_entries(target)
+        if not entries:
+            return
+        logger.info(f"继续查询未完成的极影视 {target.label} 刷新任务：{list(entries.keys())}")
+        metrics = self.__new_metrics(target, "恢复")
+        try:
+            if not target.client.ready():
+                metrics["status"] = "极空间暂停请求"
+                return
+            stage_time = time.time()
+            total_msgtext = self.__rescan_all(target, list(entries.keys()),
+                                              {classify: entry["classification_id"] for classify, entry in entries.items()},
+                                              metrics)
+            self.__record_stage(metrics, "rescan", stage_time)
+            if self._notifyaggregation and self._notify and total_msgtext:
+                self.post_message(mtype=NotificationType.Plugin, title="【刷新极影视】", text=total_msgtext)
+            if self.__cancelled():
+                metrics["status"] = "已取消"
+            elif not metrics["status"]:
+                metrics["status"] = "完成"
         except Exception as e:
-            logger.error(f"极影视刷新出错：" + str(e))
-            return False
-        return False
+            logger.error(f"继续查询极影视 {target.label} 刷新任务出错：{str(e)}")
+            metrics["status"] = f"出错：{str(e)}"
+        finally:
+            self.__save_metrics(target, metrics)
+
+    def __breaker_changed(self, target: ZspaceTarget, state: str, message: str):
+        """
+        极空间熔断状态变化时发送一次通知
+        """
+        name = f"极空间 {target.label}" if len(self._targets) > 1 else "极空间"
+        if state == CircuitBreaker.CLOSED:
+            text = f"{name}已恢复连接，刷新恢复正常"
+        else:
+            text = f"{name}：{target.client.breaker_message() if target.client else ''}\n{message}"
+        self.post_message(mtype=NotificationType.Plugin, title="【刷新极影视】", text=text)
+
+    def __report_task(self, target: ZspaceTarget, task: Dict[str, Any], result: str, metrics: Dict[str, Any]) -> str:
+        """
+        记录单个分类刷新结果并发送通知
+        :return: 聚合通知时返回通知文本
+        """
+        self.__update_progress(target, task["classify"], status=result,
+                               duration=round(time.time() - task["start_time"], 1) if task.get("start_time") else None)
+        metrics["classifies"].append({
+            "name": task["classify"],
+            "start": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(task["start_time"])) if task.get("start_time") else None,
+            "duration": round(time.time() - task["start_time"], 1) if task.get("start_time") else None,
+            "polls": task.get("polls", 0),
+            "result": result
+        })
+        msgtext = f"分类：{self.__classify_label(target, task['classify'])} {result}\n"
+        if task.get("start_time"):
+            msgtext += f"开始时间： {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(task['start_time']))}\n" \
+                       + f"用时： {int(time.time() - task['start_time'])} 秒\n"
+        if not self._notifyaggregation and self._notify:
+            self.post_message(
+                mtype=NotificationType.Plugin,
+                title="【刷新极影视】",
+                text=msgtext)
+        elif self._notifyaggregation and self._notify:
+            return msgtext
+        return ""
 
     @staticmethod
-    def generate_string():
-        timestamp = str(time.time())  # 获取当前的时间戳
-        four_digit_random = str(random.randint(1000,9999))  # 生成四位的随机数
-        return f"{timestamp}_{four_digit_random}"  # 返回格式化后的字符串
+    def __new_metrics(target: ZspaceTarget, trigger: str) -> Dict[str, Any]:
+        """
+        新建一次运行的数据记录，每个极空间单独记录
+        """
+        return {"time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'), "start": time.time(),
+                "host": target.label, "trigger": trigger, "status": None, "stages": {}, "classifies": [],
+                "limiter_start": target.client.limiter_stats() if target.client else None}
+
+    @staticmethod
+    def __record_stage(metrics: Dict[str, Any], stage: str, start: float) -> float:
+        """
+        记录阶段耗时
+        :return: 当前时间，作为下一阶段开始时间
+        """
+        now = time.time()
+        metrics["stages"][stage] = round(now - start, 3)
+        return now
+
+    def __save_metrics(self, target: ZspaceTarget, metrics: Dict[str, Any]):
+        """
+        保存运行数据，保留最近的记录
+        """
+        metrics["total"] = round(time.time() - metrics.pop("start"), 3)
+        job = getattr(self._local, "job", None)
+        if job and len(self._targets) > 1:
+            # 多个极空间时任务结果为各极空间的结果
+            with self._job_lock:
+                results = job.setdefault("hosts", {})
+                results[target.label] = metrics.get("status")
+                job["result"] = "；".join(f"{host}：{status}" for host, status in results.items())
+        else:
+            self.__update_job(job, result=metrics.get("status"))
+        # 本次运行期间该极空间的请求数及限流等待（含同一极空间其他插件的请求）
+        limiter_start = metrics.pop("limiter_start", None)
+        if limiter_start and target.client:
+            limiter_end = target.client.limiter_stats()
+            metrics["limiter"] = {
+                "rate": limiter_end["rate"],
+                "max_inflight": limiter_end["max_inflight"],
+                "requests": limiter_end["requests"] - limiter_start["requests"],
+                "throttled": limiter_end["throttled"] - limiter_start["throttled"],
+                "wait_seconds": round(limiter_end["wait_seconds"] - limiter_start["wait_seconds"], 3),
+            }
+        with self._state_lock:
+            history = self.get_data("metrics") or []
+            history.append(metrics)
+            self.save_data("metrics", history[-self._metrics_keep:])
+
+    def get_metrics(self, host: str = None) -> List[Dict[str, Any]]:
+        """
+        API：最近运行数据
+        :param host: 只返回该极空间的运行数据
+        """
+        history = self.get_data("metrics") or []
+        if host:
+            history = [run for run in history if run.get("host") == host]
+        return history
+
+    def __submit_rescan(self, target: ZspaceTarget, classify: str, classification_id: Any) -> Optional[str]:
+        """
+        提交分类刷新请求
+        :return: 任务ID
+        """
+        try:
+            task_id = target.client.submit_rescan(classification_id)
+        except ZspaceError as e:
+            logger.error(f"分类：{classify} 提交刷新请求出错：{str(e)}")
+            if e.kind == ZspaceError.API:
+                # 分类可能已被删除或重建，缓存的分类ID失效
+                self.__expire_classifications(target)
+            return None
+        logger.info(f"分类：{classify}开始刷新，任务ID：{task_id}")
+        return task_id
 
     @staticmethod
     def get_command() -> List[Dict[str, Any]]:
@@ -344,10 +1309,32 @@ class ZspaceMediaFresh(_PluginBase):
             "data": {
                 "action": "zsp_media_refresh"
             }
+        }, {
+            "cmd": "/zsp_media_progress",
+            "event": EventType.PluginAction,
+            "desc": "极影视刷新进度",
+            "category": "",
+            "data": {
+                "action": "zsp_media_progress"
+            }
         }]
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        return [{
+            "path": "/metrics",
+            "endpoint": self.get_metrics,
+            "methods": ["GET"],
+            "summary": "刷新运行数据",
+            "description": "最近刷新的阶段耗时及各分类刷新耗时、轮询次数，每个极空间单独记录，host为空时返回全部极空间",
+            "auth": "bear"
+        }, {
+            "path": "/job",
+            "endpoint": self.get_job,
+            "methods": ["GET"],
+            "summary": "刷新任务进度",
+            "description": "远程刷新任务的状态及各分类刷新进度，job_id为空时返回最近的任务",
+            "auth": "bear"
+        }]
 
     # def get_service(self) -> List[Dict[str, Any]]:
     # """
@@ -378,6 +1365,17 @@ class ZspaceMediaFresh(_PluginBase):
         """
         拼装插件配置页面，需要返回两块数据：1、页面配置；2、数据结构
         """
+        # 极影视分类选项，有缓存时直接使用缓存(即使已过期)，避免打开配置页等待接口
+        classify_items = []
+        target = next((target for target in self._targets if target.primary), None)
+        name_id_dict = self.__classify_cache(target).get("items") if target else None
+        if not name_id_dict and target and target.client:
+            try:
+                name_id_dict = self.__get_classifications(target)
+            except Exception as e:
+                logger.error(f"极影视获取分类列表出错：{str(e)}")
+        if name_id_dict:
+            classify_items = [{"title": name, "value": name} for name in name_id_dict.keys()]
         return [
             {
                 "component": "VForm",
@@ -389,7 +1387,7 @@ class ZspaceMediaFresh(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 4
+                                    'md': 3
                                 },
                                 'content': [
                                     {
@@ -405,7 +1403,7 @@ class ZspaceMediaFresh(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 4
+                                    'md': 3
                                 },
                                 'content': [
                                     {
@@ -421,7 +1419,7 @@ class ZspaceMediaFresh(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 4
+                                    'md': 3
                                 },
                                 'content': [
                                     {
@@ -433,6 +1431,24 @@ class ZspaceMediaFresh(_PluginBase):
                                     }
                                 ]
                             },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'idledays',
+                                            'label': '闲置天数',
+                                            'placeholder': '0',
+                                            'hint': '刷新全部分类时，该天数内无入库的分类每个周期只刷新一次，0不跳过'
+                                        }
+                                    }
+                                ]
+                            },
                         ]
                     },
                     {
@@ -469,6 +1485,181 @@ class ZspaceMediaFresh(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'concurrency',
+                                            'label': '并发刷新数',
+                                            'placeholder': '3',
+                                            'hint': '同时进行刷新的分类数量上限'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'eventrefresh',
+                                            'label': '入库触发刷新',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'debounce',
+                                            'label': '入库静默时间(秒)',
+                                            'placeholder': '120',
+                                            'hint': '最后一次入库后等待该时间无新入库再刷新'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'maxdelay',
+                                            'label': '最大延迟(秒)',
+                                            'placeholder': '600',
+                                            'hint': '持续入库时首次入库后最多等待该时间即刷新'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'tasktimeout',
+                                            'label': '单分类超时(分钟)',
+                                            'placeholder': '60',
+                                            'hint': '单个分类刷新超过该时间不再等待'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'runtimeout',
+                                            'label': '整轮超时(分钟)',
+                                            'placeholder': '180',
+                                            'hint': '一轮刷新超过该时间剩余分类不再等待'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'classifyttl',
+                                            'label': '分类缓存时间(分钟)',
+                                            'placeholder': '1440',
+                                            'hint': '极影视分类列表缓存时间，新建分类后会自动重新获取'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'ratelimit',
+                                            'label': '每秒请求数',
+                                            'placeholder': '5',
+                                            'hint': '请求极空间的速率上限，0为不限制，与同一极空间的其他插件共用'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'maxinflight',
+                                            'label': '同时请求数',
+                                            'placeholder': '2',
+                                            'hint': '同时进行的极空间请求上限，0为不限制，与同一极空间的其他插件共用'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -542,9 +1733,9 @@ class ZspaceMediaFresh(_PluginBase):
                                         'component': 'VTextField',
                                         'props': {
                                             'model': 'waittime',
-                                            'label': '等待时间(秒)',
+                                            'label': '最大轮询间隔(秒)',
                                             'placeholder': '60',
-                                            'hint': '获取刷新状态的频率'
+                                            'hint': '获取刷新状态的最长间隔，开始时快速查询并逐步退避'
                                         }
                                     }
                                 ]
@@ -598,13 +1789,14 @@ class ZspaceMediaFresh(_PluginBase):
                                 },
                                 'content': [
                                     {
-                                        'component': 'VTextField',
+                                        'component': 'VCombobox',
                                         'props': {
+                                            'chips': True,
+                                            'multiple': True,
                                             'model': 'moivelib',
                                             'label': '电影分类名',
-                                            'placeholder': '多个逗号分割',
-                                            'rows': 6,
-                                            'hint': '包含电影的极影视分类名，多个逗号分割'
+                                            'items': classify_items,
+                                            'hint': '包含电影的极影视分类名，可选择或输入'
                                         }
                                     }                                  
                                 ]
@@ -617,19 +1809,43 @@ class ZspaceMediaFresh(_PluginBase):
                                 },
                                 'content': [
                                      {
-                                        'component': 'VTextField',
+                                        'component': 'VCombobox',
                                         'props': {
+                                            'chips': True,
+                                            'multiple': True,
                                             'model': 'tvlib',
                                             'label': '电视剧分类名',
-                                            'placeholder': '多个逗号分割',
-                                            'rows': 6,
-                                            'hint': '包含电视剧、综艺、纪录片、动漫的极影视分类名，多个逗号分割'
+                                            'items': classify_items,
+                                            'hint': '包含电视剧、综艺、纪录片、动漫的极影视分类名，可选择或输入'
                                         }
                                     }
                                 ]
                             }
                         ],
                     }, 
+                    {
+                        "component": "VRow",
+                        "content": [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextarea',
+                                        'props': {
+                                            'model': 'pathmapping',
+                                            'label': '路径映射',
+                                            'rows': 3,
+                                            'placeholder': '每行一个：网盘路径#极影视分类1,极影视分类2',
+                                            'hint': '其他网盘挂载路径直接指定需刷新的极影视分类'
+                                        }
+                                    }
+                                ]
+                            }
+                        ],
+                    },
                     {
                         "component": "VRow",
                         "content": [
@@ -651,6 +1867,32 @@ class ZspaceMediaFresh(_PluginBase):
                             }
                         ],
                     },
+                    {
+                        "component": "VRow",
+                        "content": [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextarea',
+                                        'props': {
+                                            'model': 'targets',
+                                            'label': '多极空间',
+                                            'rows': 4,
+                                            'placeholder': '[{"name": "NAS2", "zsphost": "http://192.168.1.3:5055", '
+                                                           '"zspcookie": "...", "startswith": ["/cloud2"], '
+                                                           '"moivelib": "电影", "tvlib": "电视剧", '
+                                                           '"pathmapping": ["/cloud2/动漫#动漫"]}]',
+                                            'hint': '其他极空间，JSON列表，每项的配置与上方相同，名称不能重复；各极空间并行刷新'
+                                        }
+                                    }
+                                ]
+                            }
+                        ],
+                    },
                     {
                         'component': 'VRow',
                         'content': [
@@ -683,21 +1925,160 @@ class ZspaceMediaFresh(_PluginBase):
             "cron": "5 1 * * *",
             "timescope": 1,
             "waittime":60,
-            "unit":"day"
+            "unit":"day",
+            "concurrency": 3,
+            "tasktimeout": 60,
+            "runtimeout": 180,
+            "eventrefresh": False,
+            "debounce": 120,
+            "maxdelay": 600,
+            "classifyttl": 1440,
+            "idledays": 0,
+            "ratelimit": 5,
+            "maxinflight": 2,
+            "targets": ""
         }
 
     def get_page(self) -> List[dict]:
-        pass
+        """
+        拼装插件详情页面，展示最近刷新的耗时数据
+        """
+        history = list(reversed(self.get_data("metrics") or []))
+        if not history:
+            return [
+                {
+                    'component': 'div',
+                    'text': '暂无刷新记录',
+                    'props': {
+                        'class': 'text-center',
+                    }
+                }
+            ]
+
+        def _seconds(value) -> str:
+            return f"{value}s" if value is not None else "-"
+
+        # 升级前的运行数据没有极空间名称，归属默认目标
+        targets = {target.label: target for target in self._targets}
+        default_host = self._targets[0].label if self._targets else "-"
+        # 最近运行
+        run_rows = []
+        for run in history:
+            stages = run.get("stages") or {}
+            classifies = run.get("classifies") or []
+            slowest = max(classifies, key=lambda c: c.get("duration") or 0) if classifies else None
+            limiter = run.get("limiter") or {}
+            run_rows.append({
+                'component': 'tr',
+                'content': [
+                    {'component': 'td', 'text': run.get("time")},
+                    {'component': 'td', 'text': run.get("host") or default_host},
+                    {'component': 'td', 'text': run.get("trigger")},
+                    {'component': 'td', 'text': run.get("status") or "-"},
+                    {'component': 'td', 'text': _seconds(run.get("total"))},
+                    {'component': 'td', 'text': _seconds(stages.get("history_query"))},
+                    {'component': 'td', 'text': _seconds(stages.get("history_filter"))},
+                    {'component': 'td', 'text': _seconds(stages.get("classification_list"))},
+                    {'component': 'td', 'text': _seconds(stages.get("rescan"))},
+                    {'component': 'td', 'text': len(classifies)},
+                    {'component': 'td', 'text': sum(c.get("polls") or 0 for c in classifies)},
+                    {'component': 'td',
+                     'text': f"{slowest['name']} {_seconds(slowest.get('duration'))}" if slowest else "-"},
+                    {'component': 'td', 'text': limiter.get("requests", "-")},
+                    {'component': 'td', 'text': _seconds(limiter.get("wait_seconds"))},
+                ]
+            })
+        # 分类汇总
+        classify_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for run in history:
+            for item in run.get("classifies") or []:
+                stat = classify_stats.setdefault((run.get("host") or default_host, item["name"]),
+                                                 {"last": None, "durations": [], "polls": []})
+                if stat["last"] is None:
+                    stat["last"] = item
+                if item.get("duration") is not None:
+                    stat["durations"].append(item["duration"])
+                stat["polls"].append(item.get("polls") or 0)
+        classify_rows = []
+        for (host, name), stat in classify_stats.items():
+            durations = stat["durations"]
+            estimate = self.__estimate(targets[host], name) if host in targets else None
+            classify_rows.append({
+                'component': 'tr',
+                'content': [
+                    {'component': 'td', 'text': host},
+                    {'component': 'td', 'text': name},
+                    {'component': 'td', 'text': stat["last"].get("result")},
+                    {'component': 'td', 'text': _seconds(stat["last"].get("duration"))},
+                    {'component': 'td',
+                     'text': _seconds(round(sum(durations) / len(durations), 1)) if durations else "-"},
+                    {'component': 'td', 'text': _seconds(max(durations)) if durations else "-"},
+                    {'component': 'td', 'text': round(sum(stat["polls"]) / len(stat["polls"]), 1)},
+                    {'component': 'td', 'text': len(stat["polls"])},
+                    {'component': 'td',
+                     'text': f"{_seconds(estimate[0])} / {_seconds(estimate[1])}" if estimate else "-"},
+                ]
+            })
+
+        def _table(title: str, headers: List[str], rows: List[dict]) -> dict:
+            return {
+                'component': 'VCard',
+                'props': {'class': 'mb-3'},
+                'content': [
+                    {'component': 'VCardTitle', 'text': title},
+                    {
+                        'component': 'VTable',
+                        'props': {'hover': True, 'density': 'compact'},
+                        'content': [
+                            {
+                                'component': 'thead',
+                                'content': [
+                                    {
+                                        'component': 'tr',
+                                        'content': [{'component': 'th', 'props': {'class': 'text-start ps-4'},
+                                                     'text': header} for header in headers]
+                                    }
+                                ]
+                            },
+                            {'component': 'tbody', 'content': rows}
+                        ]
+                    }
+                ]
+            }
+
+        return [
+            _table('分类刷新耗时', ['极空间', '分类', '最近结果', '最近耗时', '平均耗时', '最长耗时', '平均轮询次数', '刷新次数',
+                                '预计耗时/p90'],
+                   classify_rows),
+            _table('最近运行', ['时间', '极空间', '触发', '结果', '总耗时', '查询历史', '过滤路由', '分类列表', '刷新',
+                                '分类数', '轮询次数', '最慢分类', '请求数', '限流等待'], run_rows)
+        ]
 
     def stop_service(self):
         """
         退出插件
         """
         try:
+            # 通知刷新线程退出，不等待进行中的刷新任务完成：轮询及限流等待立即结束，
+            # 已发出的极空间请求最长在请求超时(20秒)后结束
+            self._cancel_event.set()
+            with self._job_lock:
+                for job in self._jobs.values():
+                    if job["status"] == "排队中":
+                        job.update(status="已取消", finished=time.time())
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
-                    self._scheduler.shutdown()
+                    self._scheduler.shutdown(wait=False)
                 self._scheduler = None
+            with self._worker_lock:
+                worker, self._worker = self._worker, None
+                self._queued = None
+            if worker and worker is not threading.current_thread():
+                worker.join(timeout=1)
+            for target in self._targets:
+                if target.client:
+                    target.client.close()
+                    target.client = None
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
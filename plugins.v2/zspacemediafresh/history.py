@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from typing import Optional, Any, List, Tuple
+
+from sqlalchemy import func
+
+from app.db import SessionFactory
+from app.db.models.transferhistory import TransferHistory
+
+
+@dataclass
+class TransferGroup:
+    """
+    网盘根路径下按 类型+二级分类 聚合的入库记录
+    """
+    # 匹配的根路径
+    root: str
+    type: Optional[str]
+    category: Optional[str]
+    # 入库成功的记录数
+    count: int
+    # 最近入库时间
+    last_date: str
+
+
+@dataclass
+class TransferSummary:
+    """
+    时间范围内入库记录汇总
+    """
+    # 记录总数(含非网盘路径及失败记录)
+    total: int = 0
+    # 最新记录 (id, date)，用于推进水位
+    latest: Optional[Tuple[int, str]] = None
+    groups: List[TransferGroup] = field(default_factory=list)
+
+
+def summarize_transfers(date: str, after_id: Optional[int], roots: List[str]) -> TransferSummary:
+    """
+    在数据库中按根路径过滤并聚合入库记录，只返回聚合结果，不加载整行数据
+    :param date: 只统计该时间之后的记录
+    :param after_id: 只统计该ID之后的记录
+    :param roots: 网盘根路径，记录按最长前缀归属
+    """
+    with SessionFactory() as db:
+        conditions = [TransferHistory.date > date]
+        if after_id:
+            conditions.append(TransferHistory.id > after_id)
+        total, latest_id = db.query(func.count(TransferHistory.id),
+                                    func.max(TransferHistory.id)).filter(*conditions).one()
+        summary = TransferSummary(total=total or 0)
+        if not latest_id:
+            return summary
+        latest_date = db.query(TransferHistory.date).filter(TransferHistory.id == latest_id).scalar()
+        summary.latest = (latest_id, latest_date)
+        for root in roots:
+            root_conditions = conditions + [TransferHistory.status == 1,
+                                            TransferHistory.dest.startswith(root, autoescape=True)]
+            # 归属于更长根路径的记录不重复统计
+            for other in roots:
+                if other != root and other.startswith(root):
+                    root_conditions.append(~TransferHistory.dest.startswith(other, autoescape=True))
+            rows: List[Any] = db.query(TransferHistory.type,
+                                       TransferHistory.category,
+                                       func.count(TransferHistory.id),
+                                       func.max(TransferHistory.date)) \
+                .filter(*root_conditions) \
+                .group_by(TransferHistory.type, TransferHistory.category) \
+                .all()
+            summary.groups.extend(TransferGroup(root=root, type=mtype, category=category,
+                                                count=count, last_date=last_date)
+                                  for mtype, category, count, last_date in rows)
+        return summary
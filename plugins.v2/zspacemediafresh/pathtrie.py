@@ -0,0 +1,77 @@
+from typing import Optional, Any, Dict, List, Tuple
+
+
+class PathTrie:
+    """
+    路径前缀树，按最长前缀匹配路径所属的根路径
+    匹配耗时只与路径长度有关，与配置的根路径数量无关
+    """
+
+    # 节点上保存根路径及其路由值的键
+    _END = "\0"
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, prefix: str, value: Any = None):
+        """
+        添加根路径
+        :param prefix: 根路径前缀
+        :param value: 路由值
+        """
+        if not prefix:
+            return
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if self._END not in node:
+            self._size += 1
+        node[self._END] = (prefix, value)
+
+    def get(self, prefix: str) -> Any:
+        """
+        获取根路径的路由值
+        """
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node.get(self._END, (None, None))[1]
+
+    def prefixes(self) -> List[str]:
+        """
+        全部根路径
+        """
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == self._END:
+                    result.append(child[0])
+                else:
+                    stack.append(child)
+        return result
+
+    def match(self, path: str) -> Optional[Tuple[str, Any]]:
+        """
+        匹配路径所属的最长根路径
+        :param path: 待匹配路径
+        :return: (根路径, 路由值)，未匹配返回None
+        """
+        if not path:
+            return None
+        node = self._root
+        matched = None
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                matched = node[self._END]
+        return matched
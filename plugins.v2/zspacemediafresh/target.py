@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import Optional, Any, Dict
+
+from .pathtrie import PathTrie
+from .zspace import ZspaceClient
+
+
+@dataclass
+class ZspaceTarget:
+    """
+    刷新目标：一台极空间及其网盘媒体库路径、分类映射和刷新状态
+    插件主配置为默认目标，其余目标在多极空间配置中添加，各目标的数据分开保存
+    """
+    # 目标名称，默认目标为空
+    name: str
+    # 极空间地址
+    host: Optional[str]
+    # 入库路径 -> 极影视分类 路由，值为None时按电影/电视剧分类名匹配
+    path_trie: PathTrie = field(default_factory=PathTrie)
+    movie_libs: frozenset = frozenset()
+    tv_libs: frozenset = frozenset()
+    client: Optional[ZspaceClient] = None
+    # 极影视分类缓存 {"host": 地址, "time": 获取时间, "items": {分类名: 分类ID}, "missing": {不存在的分类名: 确认时间}}
+    classify_cache: Optional[Dict[str, Any]] = None
+    # 分类刷新状态 {分类名: {"last_transfer", "last_rescan", "last_rescan_end"}}
+    classify_state: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # 已提交未完成的分类刷新任务 {分类名: {"task_id", "classification_id", "submit_time", "host"}}
+    journal: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # 分类刷新耗时模型 {分类名: {"ewma", "samples"}}
+    durations: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # 入库事件触发的待刷新分类，None为没有待刷新的入库事件
+    pending_classifies: Optional[set] = None
+
+    @property
+    def primary(self) -> bool:
+        """
+        是否为插件主配置的默认目标
+        """
+        return not self.name
+
+    @property
+    def label(self) -> str:
+        """
+        通知及运行数据中显示的名称
+        """
+        return self.name or self.host or "极空间"
+
+    def data_key(self, key: str) -> str:
+        """
+        插件数据键，默认目标沿用原有的键，升级后数据不丢失
+        """
+        return key if self.primary else f"{key}@{self.name}"
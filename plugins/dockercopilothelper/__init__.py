@@ -1,11 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from typing import Optional, Any, List, Dict, Tuple
+import threading
 import time
 import pytz
 import jwt
 import requests
 from requests import Session, Response
+from requests.adapters import HTTPAdapter
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from app.core.event import eventmanager, Event
@@ -16,6 +19,8 @@ from app.plugins import _PluginBase
 from app.schemas.types import EventType, NotificationType
 from app.utils.http import RequestUtils
 
+from .inventory import Container, ContainerSnapshot, InventoryCache
+
 
 class DockerCopilotHelper(_PluginBase):
     # 插件名称
@@ -25,7 +30,7 @@ class DockerCopilotHelper(_PluginBase):
     # 插件图标
     plugin_icon = "https://raw.githubusercontent.com/gxterry/MoviePilot-Plugins/main/icons/Docker_Copilot.png"
     # 插件版本
-    plugin_version = "1.1.2"
+    plugin_version = "1.4.3"
     # 插件作者
     plugin_author = "gxterry"
     # 作者主页
@@ -52,16 +57,43 @@ class DockerCopilotHelper(_PluginBase):
     _delete_images = False
     _intervallimit = None
     _interval = None
+    _update_concurrency = None
     # 备份
     _backup_cron = None
     _backups_notify = False
     _host = None
     _secretKey = None
     _scheduler: Optional[BackgroundScheduler] = None
+    # 退出事件，停止插件时中断更新进度跟踪
+    _event = threading.Event()
+    # 已签发的jwt及其过期时间、签发时使用的secretKey，过期前或secretKey变化时才重新签发
+    _jwt: Optional[str] = None
+    _jwt_exp = 0
+    _jwt_key: Optional[str] = None
+    _jwt_lock = threading.Lock()
+    # jwt有效期及提前重新签发的时间(秒)
+    _jwt_ttl = 28 * 24 * 60 * 60
+    _jwt_renew = 60 * 60
+    # 容器、镜像列表缓存，配置页与定时任务共用；缓存有效期(秒)
+    _inventory: Optional[InventoryCache] = None
+    _inventory_ttl = 300
+    # 镜像清理：同时删除的镜像数；删除失败的镜像冷却时间(秒)，连续失败时翻倍，最长7天
+    _delete_concurrency = 4
+    _image_cooldown = 24 * 60 * 60
+    _image_cooldown_max = 7 * 24 * 60 * 60
+    # 请求DC的会话，连接池复用连接
+    _session: Optional[Session] = None
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
         self.stop_service()
+        self._event = threading.Event()
+        if not self._inventory:
+            self._inventory = InventoryCache(self._inventory_ttl)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._delete_concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         if config:
             self._enabled = config.get("enabled")
             self._onlyonce = config.get("onlyonce")
@@ -77,6 +109,7 @@ class DockerCopilotHelper(_PluginBase):
             self._backups_notify = config.get("backupsnotify")
             self._intervallimit = config.get("intervallimit") or 6
             self._interval = config.get("interval") or 10
+            self._update_concurrency = config.get("updateconcurrency") or 3
 
             self._host = config.get("host")
             self._secretKey = config.get("secretKey")
@@ -175,7 +208,8 @@ class DockerCopilotHelper(_PluginBase):
                 "host": self._host,
                 "secretKey": self._secretKey,
                 "intervallimit": self._intervallimit,
-                "interval": self._interval
+                "interval": self._interval,
+                "updateconcurrency": self._update_concurrency
 
             }
         )
@@ -183,61 +217,115 @@ class DockerCopilotHelper(_PluginBase):
     def auto_update(self):
         """
         自动更新
+        开启进度汇报时按同时更新数提交容器更新任务，由一个轮询统一跟踪所有进行中任务的进度，有任务结束即提交下一个；
+        未开启进度汇报时提交全部更新任务，不查询进度
         """
         logger.info("DC助手-自动更新-准备执行")
         if self._auto_update_cron:
             # 获取用户选择的容器 循环更新
             jwt = self.get_jwt()
-            containers = self.get_docker_list()
+            snapshot = self.get_snapshot()
             # 清理无标签 and 不在使用种的镜像
             if self._delete_images:
-                images_list = self.get_images_list()
-                for images in images_list:
-                    if not images["inUsed"] and images["tag"]:
-                        self.remove_image(images["id"])
-            # 自动更新
-            for name in self._auto_update_list:
-                for container in containers:
-                    if container["name"] == name and container["haveUpdate"]:
-                        if not container["usingImage"] or container["usingImage"].startswith("sha256:"):
-                            self.post_message(
-                                mtype=NotificationType.Plugin,
-                                title="【DC助手-自动更新】",
-                                text=f"监测到您有容器TAG不正确\n【{container['name']}】\n当前镜像:{container['usingImage']}\n状态:{container['status']} "
-                                     f"{container['runningTime']}\n构建时间：{container['createTime']}\n"
-                                     f"该镜像无法通过DC自动更新,请修改TAG")
-                            continue
-                        url = '%s/api/container/%s/update' % (self._host, container['id'])
-                        usingImage = {container['usingImage']}
-                        rescanres = (RequestUtils(headers={"Authorization": jwt})
-                                     .post_res(url, {"containerName": name, "imageNameAndTag": usingImage}))
-                        data = rescanres.json()
-                        if data["code"] == 200 and data["msg"] == "success":
-                            self.post_message(
-                                mtype=NotificationType.Plugin,
-                                title="【DC助手-自动更新】",
-                                text=f"【{name}】\n容器更新任务创建成功")
-                            if self._schedule_report:
-                                iteration = 0
-                                while iteration < int(self._intervallimit):
-                                    url = '%s/api/progress/%s' % (self._host, data["data"]["taskID"])
-                                    rescanres = (RequestUtils(headers={"Authorization": jwt})
-                                                 .get_res(url))
-                                    report_json = rescanres.json()
-                                    if report_json["code"] == 200:
-                                        self.post_message(
-                                            mtype=NotificationType.Plugin,
-                                            title="【DC助手-更新进度】",
-                                            text=f"【{name}】\n进度：{report_json['msg']}"
-                                        )
-                                        if report_json["msg"] == "更新成功":
-                                            break
-                                    else:
-                                        pass
-                                    iteration += 1
-                                    if iteration >= int(self._intervallimit):
-                                        logger.info(f'DC助手-更新进度追踪--{name}-超时')
-                                    time.sleep(int(self._interval))  # 暂停N秒后继续下一次请求
+                try:
+                    self.clean_images()
+                except Exception as e:
+                    # 清理出错不影响容器更新
+                    logger.error(f"DC-镜像清理出错: {str(e)}")
+            # 待更新的容器
+            waiting = []
+            for container in snapshot.updatable(self._auto_update_list):
+                if container.bad_tag:
+                    self.post_message(
+                        mtype=NotificationType.Plugin,
+                        title="【DC助手-自动更新】",
+                        text=f"监测到您有容器TAG不正确\n【{container.name}】\n当前镜像:{container.using_image}\n状态:{container.status} "
+                             f"{container.running_time}\n构建时间：{container.create_time}\n"
+                             f"该镜像无法通过DC自动更新,请修改TAG")
+                    continue
+                waiting.append(container)
+            if not self._schedule_report:
+                for container in waiting:
+                    if self.__create_update_task(container, jwt):
+                        # 容器更新后镜像及更新状态变化
+                        self._inventory.invalidate(self.__inventory_key("containers"))
+                return
+            concurrency = max(int(self._update_concurrency or 1), 1)
+            # 进行中的更新任务 taskID -> {"name": 容器名, "polls": 已查询次数, "msg": 最近进度}
+            running: Dict[str, Dict[str, Any]] = {}
+            while (waiting or running) and not self._event.is_set():
+                # 补足同时更新数，提交更新任务
+                while waiting and len(running) < concurrency:
+                    container = waiting.pop(0)
+                    task_id = self.__create_update_task(container, jwt)
+                    if task_id:
+                        running[task_id] = {"name": container.name, "polls": 0, "msg": None}
+                        # 容器更新后镜像及更新状态变化
+                        self._inventory.invalidate(self.__inventory_key("containers"))
+                if not running:
+                    break
+                # 等待后统一查询所有进行中任务的进度
+                if self._event.wait(int(self._interval)):
+                    break
+                for task_id, task in list(running.items()):
+                    if self.__poll_update_task(task_id, task, jwt):
+                        running.pop(task_id)
+                    elif task["polls"] >= int(self._intervallimit):
+                        # 停止追踪并提交下一个，超时的任务可能仍在更新，同时更新数不是严格上限
+                        logger.info(f'DC助手-更新进度追踪--{task["name"]}-超时')
+                        running.pop(task_id)
+
+    def __create_update_task(self, container: Container, jwt: str) -> Optional[str]:
+        """
+        创建容器更新任务
+        :return: 任务ID
+        """
+        name = container.name
+        url = '%s/api/container/%s/update' % (self._host, container.id)
+        usingImage = {container.using_image}
+        try:
+            rescanres = (RequestUtils(headers={"Authorization": jwt})
+                         .post_res(url, {"containerName": name, "imageNameAndTag": usingImage}))
+            data = rescanres.json()
+            code, msg = data.get("code"), data.get("msg")
+            task_id = (data.get("data") or {}).get("taskID") if code == 200 and msg == "success" else None
+        except Exception as e:
+            logger.error(f"DC-创建容器更新任务时发生网络异常,请检查DockerCopilot服务是否正常: {name} {str(e)}")
+            return None
+        if task_id:
+            self.post_message(
+                mtype=NotificationType.Plugin,
+                title="【DC助手-自动更新】",
+                text=f"【{name}】\n容器更新任务创建成功")
+            return task_id
+        logger.error(f"DC-创建容器更新任务异常 {name} Error code: {code}, message: {msg}")
+        return None
+
+    def __poll_update_task(self, task_id: str, task: Dict[str, Any], jwt: str) -> bool:
+        """
+        查询一次更新任务进度，进度变化后发送通知
+        :return: 任务是否已结束
+        """
+        task["polls"] += 1
+        try:
+            url = '%s/api/progress/%s' % (self._host, task_id)
+            rescanres = (RequestUtils(headers={"Authorization": jwt})
+                         .get_res(url))
+            report_json = rescanres.json()
+            code, msg = report_json.get("code"), report_json.get("msg")
+        except Exception as e:
+            logger.error(f"DC-查询更新进度时发生网络异常: {task['name']} {str(e)}")
+            return False
+        if code != 200:
+            return False
+        if msg != task["msg"]:
+            self.post_message(
+                mtype=NotificationType.Plugin,
+                title="【DC助手-更新进度】",
+                text=f"【{task['name']}】\n进度：{msg}"
+            )
+        task["msg"] = msg
+        return msg == "更新成功" or "失败" in str(msg)
 
     def updatable(self):
         """
@@ -245,23 +333,22 @@ class DockerCopilotHelper(_PluginBase):
         """
         logger.info("DC助手-更新通知-准备执行")
         if self._update_cron:
-            docker_list = self.get_docker_list()
+            snapshot = self.get_snapshot()
             logger.debug(f"DC助手-更新通知-{self._updatable_list}")
-            for docker in docker_list:
-                if docker["haveUpdate"] and docker["name"] in self._updatable_list:
-                    if docker["usingImage"] and not docker["usingImage"].startswith("sha256:"):
-                        # 发送通知
-                        self.post_message(
-                            mtype=NotificationType.Plugin,
-                            title="【DC助手-更新通知】",
-                            text=f"您有容器可以更新啦！\n【{docker['name']}】\n当前镜像:{docker['usingImage']}\n状态:{docker['status']} {docker['runningTime']}\n构建时间：{docker['createTime']}")
-                    else:
-                        self.post_message(
-                            mtype=NotificationType.Plugin,
-                            title="【DC助手-更新通知】",
-                            text=f"监测到您有容器TAG不正确\n【{docker['name']}】\n当前镜像:{docker['usingImage']}\n状态:{docker['status']} "
-                                 f"{docker['runningTime']}\n构建时间：{docker['createTime']}\n"
-                                 f"该镜像无法通过DC自动更新,请修改TAG")
+            for docker in snapshot.updatable(self._updatable_list):
+                if not docker.bad_tag:
+                    # 发送通知
+                    self.post_message(
+                        mtype=NotificationType.Plugin,
+                        title="【DC助手-更新通知】",
+                        text=f"您有容器可以更新啦！\n【{docker.name}】\n当前镜像:{docker.using_image}\n状态:{docker.status} {docker.running_time}\n构建时间：{docker.create_time}")
+                else:
+                    self.post_message(
+                        mtype=NotificationType.Plugin,
+                        title="【DC助手-更新通知】",
+                        text=f"监测到您有容器TAG不正确\n【{docker.name}】\n当前镜像:{docker.using_image}\n状态:{docker.status} "
+                             f"{docker.running_time}\n构建时间：{docker.create_time}\n"
+                             f"该镜像无法通过DC自动更新,请修改TAG")
     def backup(self):
         """
         备份
@@ -302,14 +389,21 @@ class DockerCopilotHelper(_PluginBase):
         pass
 
     def get_jwt(self) -> str:
-        # 减少接口请求直接使用jwt
-        payload = {
-            "exp": int(time.time()) + 28 * 24 * 60 * 60,
-            "iat": int(time.time())
-        }
-        encoded_jwt = jwt.encode(payload, self._secretKey, algorithm="HS256")
-        logger.debug(f"DC helper get jwt---》{encoded_jwt}")
-        return "Bearer "+encoded_jwt
+        # 减少接口请求直接使用jwt，签发后缓存复用，临近过期或secretKey变化时重新签发
+        with self._jwt_lock:
+            now = int(time.time())
+            if self._jwt and self._jwt_key == self._secretKey and now < self._jwt_exp - self._jwt_renew:
+                return self._jwt
+            payload = {
+                "exp": now + self._jwt_ttl,
+                "iat": now
+            }
+            encoded_jwt = jwt.encode(payload, self._secretKey, algorithm="HS256")
+            logger.debug(f"DC helper get jwt---》{encoded_jwt}")
+            self._jwt = "Bearer " + encoded_jwt
+            self._jwt_exp = payload["exp"]
+            self._jwt_key = self._secretKey
+            return self._jwt
 
     # def get_auth(self) -> str:
     #     """
@@ -330,23 +424,59 @@ class DockerCopilotHelper(_PluginBase):
         """
         容器列表
         """
+        return self.__fetch_containers() or []
+
+    def get_snapshot(self, refresh: bool = True) -> ContainerSnapshot:
+        """
+        容器列表快照，按名称及ID索引，查询失败时为不可用的空快照
+        :param refresh: 重新获取并更新缓存；否则使用缓存，缓存过期时后台重新获取
+        """
+        snapshot = self._inventory.get(self.__inventory_key("containers"), self.__load_snapshot, refresh=refresh)
+        return snapshot or ContainerSnapshot.parse(None)
+
+    def __load_snapshot(self) -> Optional[ContainerSnapshot]:
+        """
+        请求容器列表快照，查询失败返回None，不覆盖缓存
+        """
+        data = self.__fetch_containers()
+        return ContainerSnapshot.parse(data) if data is not None else None
+
+    def __inventory_key(self, kind: str) -> str:
+        """
+        列表缓存键，修改DC地址后不使用原地址的缓存
+        """
+        return f"{kind}@{self._host}"
+
+    def __fetch_containers(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        请求容器列表
+        :return: 接口返回的容器，查询失败返回None
+        """
         try:
             docker_url = "%s/api/containers" % (self._host)
             result = (RequestUtils(headers={"Authorization":self.get_jwt() })
                       .get_res(docker_url))
             data = result.json()
             if data["code"] == 0:
-                return data["data"]
+                return data["data"] or []
             else:
                 logger.error(f"DC-获取容器列表异常 Error code: {data['code']}, message: {data['msg']}")
-                return []
+                return None
         except Exception as e:
             logger.error(f"DC-请求容器列表时发生网络异常,请检查DockerCopilot服务是否正常: {str(e)}")
-            return []
+            return None
 
-    def get_images_list(self) -> List[Dict[str, Any]]:
+    def get_images_list(self, refresh: bool = True) -> List[Dict[str, Any]]:
         """
         镜像列表
+        :param refresh: 重新获取并更新缓存；否则使用缓存，缓存过期时后台重新获取
+        """
+        return self._inventory.get(self.__inventory_key("images"), self.__fetch_images, refresh=refresh) or []
+
+    def __fetch_images(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        请求镜像列表
+        :return: 接口返回的镜像，查询失败返回None
         """
         try:
             images_url = "%s/api/images" % (self._host)
@@ -354,13 +484,89 @@ class DockerCopilotHelper(_PluginBase):
                       .get_res(images_url))
             data = result.json()
             if data["code"] == 200:
-                return data["data"]
+                return data["data"] or []
             else:
                 logger.error(f"DC-获取镜像列表异常 Error code: {data['code']}, message: {data['msg']}")
-                return []
+                return None
         except Exception as e:
             logger.error(f"DC-请求镜像列表时发生网络异常,请检查DockerCopilot服务是否正常: {str(e)}")
-            return []
+            return None
+
+    def clean_images(self) -> Dict[str, Any]:
+        """
+        清理不在使用中的镜像
+        通过连接池并行删除，删除失败的镜像进入冷却期，冷却期内跳过，连续失败时冷却时间翻倍
+        :return: 清理结果 {"removed": 清理数量, "bytes": 释放空间, "failed": 失败数量, "skipped": 冷却中跳过数量}
+        """
+        report = {"removed": 0, "bytes": 0, "failed": 0, "skipped": 0}
+        images_list = self._inventory.get(self.__inventory_key("images"), self.__fetch_images, refresh=True)
+        if images_list is None:
+            # 获取失败时不清理，也不改动已记录的删除失败镜像
+            return report
+        now = time.time()
+        # 删除失败的镜像 {镜像ID: {"count": 连续失败次数, "tag": 标签, "retry": 冷却结束时间}}，已不存在的镜像不再记录
+        image_ids = {images["id"] for images in images_list}
+        failures = {sha: failure for sha, failure in (self.get_data("image_failures") or {}).items()
+                    if sha in image_ids}
+        candidates = []
+        for images in images_list:
+            if images["inUsed"] or not images["tag"]:
+                continue
+            failure = failures.get(images["id"])
+            if failure and now < failure["retry"]:
+                logger.debug(f"DC-镜像清理失败冷却中，跳过: {images['tag']} {images['id']}")
+                report["skipped"] += 1
+                continue
+            candidates.append(images)
+        if candidates:
+            workers = min(max(int(self._delete_concurrency), 1), len(candidates))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dockercopilothelper-image") as executor:
+                results = list(executor.map(lambda images: self.remove_image(images["id"]), candidates))
+            for images, removed in zip(candidates, results):
+                if removed:
+                    report["removed"] += 1
+                    report["bytes"] += self.__image_size(images)
+                    failures.pop(images["id"], None)
+                    continue
+                report["failed"] += 1
+                count = (failures.get(images["id"]) or {}).get("count", 0) + 1
+                failures[images["id"]] = {
+                    "count": count,
+                    "tag": images.get("tag"),
+                    "retry": now + min(self._image_cooldown * 2 ** (count - 1), self._image_cooldown_max)
+                }
+        self.save_data("image_failures", failures)
+        logger.info(f"DC-镜像清理完成 清理{report['removed']}个，释放{self.__format_size(report['bytes'])}，"
+                    f"失败{report['failed']}个，冷却中跳过{report['skipped']}个")
+        if report["removed"] or report["failed"]:
+            self.post_message(
+                mtype=NotificationType.Plugin,
+                title="【DC助手-镜像清理】",
+                text=f"清理镜像：{report['removed']}个\n释放空间：{self.__format_size(report['bytes'])}\n"
+                     f"清理失败：{report['failed']}个\n冷却中跳过：{report['skipped']}个")
+        return report
+
+    @staticmethod
+    def __image_size(images: Dict[str, Any]) -> int:
+        """
+        镜像大小(字节)，格式不正确时按0计算
+        """
+        try:
+            return int(images.get("size") or 0)
+        except (TypeError, ValueError):
+            logger.debug(f"DC-镜像大小格式不正确: {images.get('id')} {images.get('size')}")
+            return 0
+
+    @staticmethod
+    def __format_size(size: float) -> str:
+        """
+        字节数转为可读大小
+        """
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024:
+                return f"{int(size)}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+            size /= 1024
+        return f"{size:.1f}TB"
 
     def remove_image(self, sha) -> bool:
         """
@@ -372,7 +578,8 @@ class DockerCopilotHelper(_PluginBase):
             logger.debug(f'result---{result}')
             data = result.json()
             if data["code"] == 200:
-                logger.error(f"DC-清理镜像成功: {sha}")
+                logger.info(f"DC-清理镜像成功: {sha}")
+                self._inventory.invalidate(self.__inventory_key("images"))
                 return True
             else:
                 logger.error(f"DC-清理镜像异常 Error code: {data['code']}, message: {data['msg']}")
@@ -388,18 +595,20 @@ class DockerCopilotHelper(_PluginBase):
         updatable_list = []
         auto_update_list = []
         if self._secretKey and self._host:
-            data = self.get_docker_list()
-            # 移除不存在的选项
-            names = [item['name'] for item in data]
-            if self._updatable_list:
-                self._updatable_list = [item for item in self._updatable_list if item in names]
-            if self._auto_update_list:
-                self._auto_update_list = [item for item in self._auto_update_list if item in names]
-            if self._auto_update_list or self._updatable_list:
-                self.__update_config()
-            for item in data:
-                updatable_list.append({"title": item["name"], "value": item["name"]})
-                auto_update_list.append({"title": item["name"], "value": item["name"]})
+            # 使用缓存的容器列表立即渲染，缓存过期时后台重新获取，只在首次打开时等待接口
+            snapshot = self.get_snapshot(refresh=False)
+            age = self._inventory.age(self.__inventory_key("containers"))
+            # 移除不存在的选项，查询失败或缓存已过期时保留已选择的容器
+            if snapshot.available and age is not None and age < self._inventory.ttl:
+                if self._updatable_list:
+                    self._updatable_list = [item for item in self._updatable_list if item in snapshot.by_name]
+                if self._auto_update_list:
+                    self._auto_update_list = [item for item in self._auto_update_list if item in snapshot.by_name]
+                if self._auto_update_list or self._updatable_list:
+                    self.__update_config()
+            for name in snapshot.names:
+                updatable_list.append({"title": name, "value": name})
+                auto_update_list.append({"title": name, "value": name})
         return [
             {
                 "component": "VForm",
@@ -588,7 +797,7 @@ class DockerCopilotHelper(_PluginBase):
                                                         'component': 'VCol',
                                                         'props': {
                                                             'cols': 12,
-                                                            'md': 6
+                                                            'md': 3
                                                         },
                                                         'content': [
                                                             {
@@ -601,6 +810,24 @@ class DockerCopilotHelper(_PluginBase):
                                                             }
                                                         ]
                                                     },
+                                                    {
+                                                        'component': 'VCol',
+                                                        'props': {
+                                                            'cols': 12,
+                                                            'md': 3
+                                                        },
+                                                        'content': [
+                                                            {
+                                                                'component': 'VTextField',
+                                                                'props': {
+                                                                    'model': 'updateconcurrency',
+                                                                    'label': '同时更新数',
+                                                                    'placeholder': '3',
+                                                                    'hint': '开启进度汇报时生效，同时进行的容器更新任务数，有任务完成或进度追踪超时后再更新下一个，默认3'
+                                                                }
+                                                            }
+                                                        ]
+                                                    },
                                                     {
                                                         'component': 'VCol',
                                                         'props': {
@@ -614,7 +841,7 @@ class DockerCopilotHelper(_PluginBase):
                                                                     'model': 'interval',
                                                                     'label': '跟踪间隔(秒)',
                                                                     'placeholder': '10',
-                                                                    'hint': '开启进度汇报时,每多少秒检查一次进度状态，默认10秒'
+                                                                    'hint': '每多少秒检查一次所有进行中更新任务的进度，默认10秒'
                                                                 }
                                                             }
                                                         ]
@@ -632,7 +859,7 @@ class DockerCopilotHelper(_PluginBase):
                                                                     'model': 'intervallimit',
                                                                     'label': '检查次数',
                                                                     'placeholder': '6',
-                                                                    'hint': '开启进度汇报，当达限制检查次数后放弃追踪,默认6次'
+                                                                    'hint': '更新任务达到检查次数后放弃追踪,默认6次'
                                                                 }
                                                             }
                                                         ]
@@ -782,7 +1009,8 @@ class DockerCopilotHelper(_PluginBase):
             "deleteimages": False,
             "backupsnotify": False,
             "interval": 10,
-            "intervallimit": 6
+            "intervallimit": 6,
+            "updateconcurrency": 3
 
         }
 
@@ -794,11 +1022,15 @@ class DockerCopilotHelper(_PluginBase):
         退出插件
         """
         try:
+            self._event.set()
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
                     self._scheduler.shutdown()
                 self._scheduler = None
+            if self._session:
+                self._session.close()
+                self._session = None
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
 
@@ -811,15 +1043,15 @@ class DockerCopilotHelper(_PluginBase):
                    raise_exception: bool = False
                    ) -> Optional[Response]:
         try:
-            return requests.delete(url,
-                                   params=params,
-                                   data=data,
-                                   json=json,
-                                   verify=False,
-                                   headers=headers,
-                                   timeout=20,
-                                   allow_redirects=allow_redirects,
-                                   stream=False)
+            return (self._session or requests).delete(url,
+                                                      params=params,
+                                                      data=data,
+                                                      json=json,
+                                                      verify=False,
+                                                      headers=headers,
+                                                      timeout=20,
+                                                      allow_redirects=allow_redirects,
+                                                      stream=False)
         except requests.exceptions.RequestException:
             if raise_exception:
                 raise requests.exceptions.RequestException
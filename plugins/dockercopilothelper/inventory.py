@@ -0,0 +1,166 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Any, Callable, Dict, Iterator, List, Tuple
+
+from app.log import logger
+
+
+@dataclass(frozen=True)
+class Container:
+    """
+    DockerCopilot /api/containers 返回的单个容器
+    """
+    id: str
+    name: str
+    using_image: Optional[str]
+    status: Optional[str]
+    running_time: Optional[str]
+    create_time: Optional[str]
+    # 有可用更新
+    have_update: bool
+    # 镜像TAG不正确（无镜像名或为sha256摘要），无法通过DC自动更新
+    bad_tag: bool
+
+    @classmethod
+    def parse(cls, item: Dict[str, Any]) -> "Container":
+        image = item.get("usingImage")
+        return cls(id=item.get("id"),
+                   name=item.get("name"),
+                   using_image=image,
+                   status=item.get("status"),
+                   running_time=item.get("runningTime"),
+                   create_time=item.get("createTime"),
+                   have_update=bool(item.get("haveUpdate")),
+                   bad_tag=not image or image.startswith("sha256:"))
+
+
+class ContainerSnapshot:
+    """
+    一次容器列表查询的结果，按名称及ID索引
+    """
+
+    def __init__(self, containers: List[Container], available: bool = True, fetched: float = None):
+        """
+        :param containers: 容器，保持接口返回的顺序
+        :param available: 是否查询成功，查询失败时为空快照
+        :param fetched: 查询时间
+        """
+        self.containers = containers
+        self.available = available
+        self.fetched = fetched if fetched is not None else time.time()
+        self.by_name: Dict[str, Container] = {container.name: container for container in containers}
+        self.by_id: Dict[str, Container] = {container.id: container for container in containers}
+
+    @classmethod
+    def parse(cls, data: Optional[List[Dict[str, Any]]]) -> "ContainerSnapshot":
+        """
+        解析容器列表，None表示查询失败
+        """
+        if data is None:
+            return cls([], available=False)
+        return cls([Container.parse(item) for item in data])
+
+    def __iter__(self) -> Iterator[Container]:
+        return iter(self.containers)
+
+    def __len__(self) -> int:
+        return len(self.containers)
+
+    @property
+    def names(self) -> List[str]:
+        return [container.name for container in self.containers]
+
+    def get(self, name: str) -> Optional[Container]:
+        return self.by_name.get(name)
+
+    def updatable(self, names: Optional[List[str]]) -> List[Container]:
+        """
+        选中的容器中有可用更新的容器，按选择的顺序
+        """
+        result = []
+        for name in names or []:
+            container = self.by_name.get(name)
+            if container and container.have_update:
+                result.append(container)
+        return result
+
+
+class InventoryCache:
+    """
+    容器、镜像列表缓存，配置页与定时任务共用
+    有效期内直接使用缓存；过期后先返回旧数据，同时在后台重新获取（同一列表只有一个后台请求）
+    """
+
+    def __init__(self, ttl: float):
+        """
+        :param ttl: 缓存有效期(秒)
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # 键 -> (获取时间, 数据)
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        # 后台重新获取中的键
+        self._loading: set = set()
+
+    def get(self, key: str, loader: Callable[[], Any], refresh: bool = False) -> Any:
+        """
+        获取列表
+        :param key: 缓存键
+        :param loader: 请求列表，失败返回None
+        :param refresh: 忽略缓存同步重新获取，获取成功后更新缓存
+        :return: 列表，没有缓存且获取失败时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and not refresh:
+            if time.time() - entry[0] >= self.ttl:
+                self.__revalidate(key, loader)
+            return entry[1]
+        value = loader()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+
+    def age(self, key: str) -> Optional[float]:
+        """
+        缓存已存在的秒数，没有缓存返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return time.time() - entry[0] if entry else None
+
+    def invalidate(self, key: str):
+        """
+        缓存过期，下次使用时后台重新获取
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries[key] = (0, entry[1])
+
+    def __revalidate(self, key: str, loader: Callable[[], Any]):
+        """
+        后台重新获取过期的列表
+        """
+        with self._lock:
+            if key in self._loading:
+                return
+            self._loading.add(key)
+
+        def _load():
+            try:
+                value = loader()
+                if value is not None:
+                    self.put(key, value)
+            except Exception as e:
+                logger.error(f"DC-后台刷新列表缓存失败: {key} {str(e)}")
+            finally:
+                with self._lock:
+                    self._loading.discard(key)
+
+        threading.Thread(target=_load, name=f"dockercopilothelper-{key}", daemon=True).start()
@@ -3,7 +3,6 @@ from typing import Optional, Any, List, Dict, Tuple
 
 import pytz
 import re
-import random
 import time
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -14,7 +13,8 @@ from app.core.config import settings
 from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas.types import EventType, NotificationType
-from app.utils.http import RequestUtils
+
+from .zspace import CircuitBreaker, ZspaceClient, ZspaceCredential, ZspaceError
 
 
 class ZspaceMediaFresh(_PluginBase):
@@ -25,7 +25,7 @@ class ZspaceMediaFresh(_PluginBase):
     # 插件图标
     plugin_icon = "https://raw.githubusercontent.com/gxterry/MoviePilot-Plugins/main/icons/Zspace_B.png"
     # 插件版本
-    plugin_version = "1.5.2"
+    plugin_version = "1.7.2"
     # 插件作者
     plugin_author = "gxterry"
     # 作者主页
@@ -54,6 +54,7 @@ class ZspaceMediaFresh(_PluginBase):
     _notifyaggregation = False
     _unit=None
     _scheduler: Optional[BackgroundScheduler] = None
+    _client: Optional[ZspaceClient] = None
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
@@ -75,11 +76,18 @@ class ZspaceMediaFresh(_PluginBase):
             self._notify = config.get("notify")
             self._notifyaggregation =config.get("notifyaggregation")
             self._unit =config.get("unit") or "day"
-            if self._zsphost:           
-                if not self._zsphost.startswith("http"):
-                    self._zsphost = "http://" + self._zsphost
-                if  self._zsphost.endswith("/"):
-                    self._zsphost = self._zsphost[:-1]
+            self._zsphost = ZspaceClient.normalize_host(self._zsphost)
+            # 极空间接口客户端，与同一极空间的其他插件共用连接池
+            if self._zsphost and self._zspcookie:
+                try:
+                    credential = ZspaceCredential.parse(self._zspcookie, required=("token", "device_id"),
+                                                        form_fields=("token", "device_id"))
+                except ValueError as err:
+                    logger.error(f"极空间cookie配置错误：{str(err)}")
+                    self.systemmessage.put(f"极空间cookie配置错误：{err}")
+                else:
+                    self._client = ZspaceClient(self._zsphost, credential,
+                                                on_breaker_change=self.__breaker_changed)
             # 加载模块
             if self._enabled or self._onlyonce:
                 # 定时服务
@@ -140,6 +148,10 @@ class ZspaceMediaFresh(_PluginBase):
         刷新极影视
         """
         classify_list = []
+        # 极空间暂停请求时不查询入库记录
+        if self._client and not self._client.ready():
+            logger.info(f"极空间暂停请求（{self._client.breaker_message()}），跳过本次刷新")
+            return
         if not self._flushall:
             # 参数验证
             if not self._startswith:
@@ -201,82 +213,76 @@ class ZspaceMediaFresh(_PluginBase):
         """
         刷新极影视
         """
-        if not self._zsphost or not self._zspcookie:
+        if not self._client:
+            return False
+        # 极空间无法连接或cookie失效时跳过，到期后只做一次探测
+        if not self._client.ready():
+            logger.info(f"极空间暂停请求（{self._client.breaker_message()}），跳过本次刷新")
             return False
-        cookie = RequestUtils.cookie_parse(self._zspcookie)
-        token = cookie['token']
-        device_id = cookie['device_id']
         msgtext= None
         total_msgtext = ""
         # 获取分类列表
-        list_url = "%s/zvideo/classification/list?&rnd=%s&webagent=v2" % (self._zsphost, self.generate_string() )
         try:
-            rsp_body=RequestUtils(cookies=self._zspcookie).post_res(list_url)
-            res = rsp_body.json()
-            logger.debug(f"获取极影视分类 ：{res}")
-            if res and res["code"] == "200":
-                if res["data"] and isinstance(res["data"], list):
-                    # 获取分类ID
-                    name_id_dict = {item["name"]: item["id"] for item in res['data']}
-                    # 是否全类型刷新
-                    if self._flushall :
-                            classify_list = [item["name"] for item in res['data']]
-                    for classify in classify_list:
-                        if classify not in name_id_dict:
-                            logger.info(f"分类 {classify} 不存在于极影视分类列表中，跳过刷新")
-                            continue
-                        # 提交刷新请求
-                        rescan_url = "%s/zvideo/classification/rescan?&rnd=%s&webagent=v2" % (self._zsphost, self.generate_string())
-                        formdata = {"classification_id": name_id_dict[classify],"device_id":device_id,"token":token,"device":"PC电脑","plat":"web"}
-                        rescanres = RequestUtils(headers={"Content-Type": "application/x-www-form-urlencoded"},cookies=self._zspcookie).post_res(rescan_url,formdata)
-                        rescanres_json = rescanres.json()
-                        logger.debug(f"提交刷新请求--rescanres_json：{rescanres_json}")
-                        start_time = time.time()# 记录开始时间
-                        if rescanres_json["code"] =="200" and rescanres_json["data"]["task_id"]:
-                            logger.info(f"分类：{classify}开始刷新，任务ID：{rescanres_json['data']['task_id']}")
-                            # 查询刷新结果
-                            result_url = "%s/zvideo/classification/rescan/result?&rnd=%s&webagent=v2" % (self._zsphost,self.generate_string())
-                            formdata["task_id"] = rescanres_json['data']['task_id']
-                            logger.debug(f"返回数据-----》：{formdata}")
-                            while True:
-                                #轮询状态
-                                resultRep = RequestUtils(headers={"Content-Type": "application/x-www-form-urlencoded"},
-                                                        cookies=self._zspcookie).post_res(result_url, formdata)
-                                result_json = resultRep.json()
-                                if result_json and result_json["code"] in ["200","N120024"] and result_json["data"]["task_status"] == 4:
-                                    logger.info(f"分类：{classify} 刷新执行中,等待{self._waittime}秒，task_id：{rescanres_json['data']['task_id']}")
-                                    time.sleep(int(self._waittime))  #任务状态进行中 等待
-                                else:
-                                    logger.info(f"分类：{classify} 刷新任务执行结束,task_id：{rescanres_json['data']['task_id']}，task_status:{result_json['data']['task_status']}")
-                                    end_time = time.time()  # 记录结束时间
-                                    msgtext =f"分类：{classify} 刷新成功\n"+f"开始时间： {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))}\n"+f"用时： {int(end_time - start_time)} 秒\n"
-                                    if not self._notifyaggregation and self._notify:
-                                        self.post_message(
-                                            mtype=NotificationType.Plugin,
-                                            title="【刷新极影视】",
-                                            text= msgtext)
-                                    elif self._notifyaggregation and self._notify :
-                                        total_msgtext += msgtext
-                                    break
-                        else:
-                            logger.info(f"极影视获取分类列表出错：{rescanres_json}")
-                    if  self._notifyaggregation and self._notify:
-                        self.post_message(
-                                mtype=NotificationType.Plugin,
-                                title="【刷新极影视】",
-                                text=total_msgtext)
-            else:
-                logger.info(f"极影视获取分类列表出错：{res}")
+            try:
+                name_id_dict = self._client.classifications()
+            except ZspaceError as e:
+                logger.info(f"极影视获取分类列表出错：{str(e)}")
+                name_id_dict = None
+            logger.debug(f"获取极影视分类 ：{name_id_dict}")
+            if name_id_dict:
+                # 是否全类型刷新
+                if self._flushall :
+                        classify_list = list(name_id_dict.keys())
+                for classify in classify_list:
+                    if classify not in name_id_dict:
+                        logger.info(f"分类 {classify} 不存在于极影视分类列表中，跳过刷新")
+                        continue
+                    # 提交刷新请求
+                    start_time = time.time()# 记录开始时间
+                    try:
+                        task_id = self._client.submit_rescan(name_id_dict[classify])
+                    except ZspaceError as e:
+                        logger.info(f"极影视提交分类刷新出错：{str(e)}")
+                        continue
+                    logger.info(f"分类：{classify}开始刷新，任务ID：{task_id}")
+                    # 查询刷新结果
+                    while True:
+                            #轮询状态
+                            status = self._client.rescan_status(name_id_dict[classify], task_id)
+                            if status.code in ["200","N120024"] and status.task_status == 4:
+                                logger.info(f"分类：{classify} 刷新执行中,等待{self._waittime}秒，task_id：{task_id}")
+                                time.sleep(int(self._waittime))  #任务状态进行中 等待
+                            else:
+                                logger.info(f"分类：{classify} 刷新任务执行结束,task_id：{task_id}，task_status:{status.task_status}")
+                                end_time = time.time()  # 记录结束时间
+                                msgtext =f"分类：{classify} 刷新成功\n"+f"开始时间： {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))}\n"+f"用时： {int(end_time - start_time)} 秒\n"
+                                if not self._notifyaggregation and self._notify:
+                                    self.post_message(
+                                        mtype=NotificationType.Plugin,
+                                        title="【刷新极影视】",
+                                        text= msgtext)
+                                elif self._notifyaggregation and self._notify :
+                                    total_msgtext += msgtext
+                                break
+                if  self._notifyaggregation and self._notify:
+                    self.post_message(
+                            mtype=NotificationType.Plugin,
+                            title="【刷新极影视】",
+                            text=total_msgtext)
         except Exception as e:
             logger.error(f"极影视刷新出错：" + str(e))
             return False
         return False
 
-    @staticmethod
-    def generate_string():
-        timestamp = str(time.time())  # 获取当前的时间戳
-        four_digit_random = str(random.randint(1000,9999))  # 生成四位的随机数
-        return f"{timestamp}_{four_digit_random}"  # 返回格式化后的字符串
+    def __breaker_changed(self, state: str, message: str):
+        """
+        极空间熔断状态变化时发送一次通知
+        """
+        if state == CircuitBreaker.CLOSED:
+            text = "极空间已恢复连接，刷新恢复正常"
+        else:
+            text = f"{self._client.breaker_message() if self._client else ''}\n{message}"
+        self.post_message(mtype=NotificationType.Plugin, title="【刷新极影视】", text=text)
 
     @staticmethod
     def get_command() -> List[Dict[str, Any]]:
@@ -618,5 +624,8 @@ class ZspaceMediaFresh(_PluginBase):
                 if self._scheduler.running:
                     self._scheduler.shutdown()
                 self._scheduler = None
+            if self._client:
+                self._client.close()
+                self._client = None
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
\ No newline at end of file
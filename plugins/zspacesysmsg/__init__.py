@@ -2,8 +2,6 @@ from datetime import datetime, timedelta
 from typing import Optional, Any, List, Dict, Tuple
 
 import pytz
-import random
-import time
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
@@ -12,7 +10,8 @@ from app.core.config import settings
 from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas.types import EventType, NotificationType
-from app.utils.http import RequestUtils
+
+from .zspace import CircuitBreaker, ZspaceClient, ZspaceCredential, ZspaceError
 
 
 class ZspaceSysMsg(_PluginBase):
@@ -23,7 +22,7 @@ class ZspaceSysMsg(_PluginBase):
     # 插件图标
     plugin_icon = "Zspace_A.png"
     # 插件版本
-    plugin_version = "1.0"
+    plugin_version = "1.4.2"
     # 插件作者
     plugin_author = "gxterry"
     # 作者主页
@@ -42,6 +41,7 @@ class ZspaceSysMsg(_PluginBase):
     _zspcookie = None
     _zsphost = None
     _scheduler: Optional[BackgroundScheduler] = None
+    _client: Optional[ZspaceClient] = None
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
@@ -52,11 +52,17 @@ class ZspaceSysMsg(_PluginBase):
             self._cron = config.get("cron")
             self._zspcookie = config.get("zspcookie")
             self._zsphost = config.get("zsphost")
-            if self._zsphost:
-                if not self._zsphost.startswith("http"):
-                    self._zsphost = "http://" + self._zsphost
-                if self._zsphost.endswith("/"):
-                    self._zsphost = self._zsphost[:-1]
+            self._zsphost = ZspaceClient.normalize_host(self._zsphost)
+            # 极空间接口客户端，与同一极空间的其他插件共用连接池，cookie只在配置时解析一次
+            if self._zsphost and self._zspcookie:
+                try:
+                    credential = ZspaceCredential.parse(self._zspcookie)
+                except ValueError as err:
+                    logger.error(f"极空间cookie配置错误：{str(err)}")
+                    self.systemmessage.put(f"极空间cookie配置错误：{err}")
+                else:
+                    self._client = ZspaceClient(self._zsphost, credential, pool_size=1,
+                                                on_breaker_change=self.__breaker_changed)
             # 加载模块
             if self._enabled or self._onlyonce:
                 # 定时服务
@@ -102,44 +108,40 @@ class ZspaceSysMsg(_PluginBase):
         """
         极空间系统通知推送
         """
-        if not self._zsphost or not self._zspcookie:
+        if not self._client:
+            return False
+        # 极空间无法连接或cookie失效时跳过，到期后只做一次探测
+        if not self._client.ready():
+            logger.debug(f"极空间暂停请求（{self._client.breaker_message()}），跳过获取系统消息")
             return False
-        cookie = RequestUtils.cookie_parse(self._zspcookie)
-        token = cookie['token']
-        # device_id = cookie['device_id']
-        # 只获取notify类型消息
-        formdata = {"type": "notify", "start_id": 0, "num": "5", "token": token}
-        # 获取消息列表
-        list_url = "%s/action/list?&rnd=%s&webagent=v2" % (self._zsphost, self.generate_string())
         try:
-            rsp_body = RequestUtils(cookies=self._zspcookie).post_res(list_url, formdata)
-            res = rsp_body.json()
-            logger.debug(f"获取极空间系统消息 ：{res}")
-            if res and res["code"] == "200":
-                if res["data"]["list"] and isinstance(res["data"]["list"], list):
-                    for message in res["data"]["list"]:
-                        if message['is_new'] == 1:
-                            self.post_message(
-                                mtype=NotificationType.Plugin,
-                                title=f"【极空间系统消息】",
-                                text=f"{message['title']}\n内容:{message['content']} \n 时间:{message['created_at']}")
-                            #设置已读
-                            list_url = "%s/action/known?&rnd=%s&webagent=v2" % (self._zsphost, self.generate_string())
-                            form = {"ids": message["id"], "type": "notify", "start_id": 0, "num": "20", "token": token}
-                            RequestUtils(cookies=self._zspcookie).post_res(list_url, form)
-
-            else:
-                logger.info(f"获取极空间系统消息{res}")
+            # 只获取notify类型消息
+            messages = self._client.messages(msg_type="notify", num=5)
+            logger.debug(f"获取极空间系统消息 ：{messages}")
+            for message in messages:
+                if message['is_new'] == 1:
+                    self.post_message(
+                        mtype=NotificationType.Plugin,
+                        title=f"【极空间系统消息】",
+                        text=f"{message['title']}\n内容:{message['content']} \n 时间:{message['created_at']}")
+                    #设置已读
+                    self._client.mark_known(message["id"], msg_type="notify")
+        except ZspaceError as e:
+            logger.info(f"获取极空间系统消息{str(e)}")
         except Exception as e:
             logger.error(f"极空间系统消息推送" + str(e))
             return False
         return False
 
-    @staticmethod
-    def generate_string():
-        timestamp = str(time.time())  # 获取当前的时间戳
-        four_digit_random = str(random.randint(1000, 9999))  # 生成四位的随机数
-        return f"{timestamp}_{four_digit_random}"  # 返回格式化后的字符串
+    def __breaker_changed(self, state: str, message: str):
+        """
+        极空间熔断状态变化时发送一次通知
+        """
+        if state == CircuitBreaker.CLOSED:
+            text = "极空间已恢复连接，系统消息推送恢复正常"
+        else:
+            text = f"{self._client.breaker_message() if self._client else ''}\n{message}"
+        self.post_message(mtype=NotificationType.Plugin, title="【极空间系统消息】", text=text)
 
     def get_state(self) -> bool:
         return self._enabled
@@ -301,5 +303,8 @@ class ZspaceSysMsg(_PluginBase):
                 if self._scheduler.running:
                     self._scheduler.shutdown()
                 self._scheduler = None
+            if self._client:
+                self._client.close()
+                self._client = None
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
\ No newline at end of file
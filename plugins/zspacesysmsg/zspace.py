@@ -0,0 +1,700 @@
+"""
+极空间web接口客户端
+
+刷新极影视(v1/v2)、极空间系统通知各自携带本文件的相同副本（插件独立安装），
+同一进程内通过注册表共享：同一极空间地址只有一个连接池，同一cookie只解析一次。
+修改本文件时需同步更新各插件中的副本，接口不兼容时更换 _REGISTRY_NAME 的版本号。
+"""
+import random
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Any, Callable, Dict, List, Tuple
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import settings
+from app.log import logger
+from app.utils.http import RequestUtils
+
+# 进程内共享注册表的模块名
+_REGISTRY_NAME = "_zspace_shared_v6"
+
+# 默认限流：每秒请求数、同时进行的请求数
+DEFAULT_RATE_LIMIT = 5
+DEFAULT_MAX_INFLIGHT = 2
+
+# 熔断：连续失败次数阈值，打开后首次探测等待时间及最长探测间隔(秒)
+BREAKER_THRESHOLD = 3
+BREAKER_BASE_DELAY = 60
+BREAKER_MAX_DELAY = 3600
+
+# 登录失效的HTTP状态码及接口错误码
+AUTH_HTTP_STATUS = (401, 403)
+AUTH_CODES = ("N100001",)
+
+# 查询接口重试策略：重试连接失败及网关错误，重复查询没有副作用
+RETRY_POLICY = Retry(total=3, connect=3, read=0, status=2, backoff_factor=0.5,
+                     status_forcelist=(502, 503, 504), allowed_methods=None, raise_on_status=False)
+# 提交接口重试策略：只重试连接失败，此时请求尚未发出；网关错误时请求可能已到达极空间，重试会重复提交
+SUBMIT_RETRY_POLICY = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5,
+                            allowed_methods=None, raise_on_status=False)
+
+
+def _registry() -> types.ModuleType:
+    """
+    进程内共享注册表，各插件的副本通过 sys.modules 取到同一个对象
+    credentials: (cookie, token字段顺序) -> 解析后的凭证字段
+    pools: 极空间地址 -> {"session": 查询会话, "submit_session": 提交会话, "size": 连接池大小, "refs": 引用数}
+    limiters: 极空间地址 -> 限流器
+    breakers: 极空间地址 -> 网络熔断器，(极空间地址, cookie) -> 登录熔断器
+    """
+    registry = sys.modules.get(_REGISTRY_NAME)
+    if registry is None:
+        module = types.ModuleType(_REGISTRY_NAME)
+        module.lock = threading.RLock()
+        module.credentials = {}
+        module.pools = {}
+        module.limiters = {}
+        module.breakers = {}
+        registry = sys.modules.setdefault(_REGISTRY_NAME, module)
+    return registry
+
+
+class RateLimiter:
+    """
+    单个极空间地址的请求限流：令牌桶限制请求速率，同时限制进行中的请求数
+    同一地址的各插件客户端共用，配置以最后一次设置为准
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE_LIMIT, max_inflight: int = DEFAULT_MAX_INFLIGHT):
+        """
+        :param rate: 每秒请求数，0为不限制
+        :param max_inflight: 同时进行的请求数，0为不限制
+        """
+        self._cond = threading.Condition()
+        self._rate = 0.0
+        self._burst = 1.0
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._max_inflight = 0
+        self._inflight = 0
+        # 累计统计
+        self._requests = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+        self._peak_inflight = 0
+        self.configure(rate, max_inflight)
+
+    def configure(self, rate: float, max_inflight: int):
+        """
+        调整限流配置，立即生效
+        """
+        with self._cond:
+            self._rate = max(float(rate or 0), 0.0)
+            # 桶容量为1秒的请求数，空闲后最多突发这么多请求
+            self._burst = max(self._rate, 1.0)
+            self._tokens = min(self._tokens, self._burst)
+            self._max_inflight = max(int(max_inflight or 0), 0)
+            self._cond.notify_all()
+
+    # 可取消等待时每次等待的最长时间(秒)
+    CANCEL_CHECK_INTERVAL = 0.2
+
+    def acquire(self, cancel: Optional[threading.Event] = None) -> bool:
+        """
+        等待令牌及并发名额
+        :param cancel: 取消标记，置位后停止等待
+        :return: 是否获得名额，等待中被取消返回False
+        """
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                if cancel and cancel.is_set():
+                    return False
+                now = time.monotonic()
+                if self._rate:
+                    self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._max_inflight and self._inflight >= self._max_inflight:
+                    # 等待其他请求结束
+                    self._cond.wait(self.CANCEL_CHECK_INTERVAL if cancel else None)
+                elif self._rate and self._tokens < 1:
+                    wait = (1 - self._tokens) / self._rate
+                    self._cond.wait(min(wait, self.CANCEL_CHECK_INTERVAL) if cancel else wait)
+                else:
+                    break
+            if self._rate:
+                self._tokens -= 1
+            self._inflight += 1
+            self._peak_inflight = max(self._peak_inflight, self._inflight)
+            self._requests += 1
+            waited = time.monotonic() - start
+            if waited >= 0.001:
+                self._throttled += 1
+                self._wait_seconds += waited
+            return True
+
+    def release(self):
+        """
+        请求结束，释放并发名额
+        """
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        限流配置及累计统计
+        """
+        with self._cond:
+            return {"rate": self._rate, "max_inflight": self._max_inflight, "inflight": self._inflight,
+                    "requests": self._requests, "throttled": self._throttled,
+                    "wait_seconds": round(self._wait_seconds, 3), "peak_inflight": self._peak_inflight}
+
+
+class CircuitBreaker:
+    """
+    极空间熔断器：网络不可用按地址记录，同一地址的各插件客户端共用；登录失效按地址及cookie记录，只影响使用该cookie的客户端
+    连续失败达到阈值后打开；打开期间不再请求，只按指数退避发起探测，探测成功后关闭
+    """
+    CLOSED = "closed"
+    NETWORK = "network"
+    AUTH = "auth"
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, base_delay: float = BREAKER_BASE_DELAY,
+                 max_delay: float = BREAKER_MAX_DELAY):
+        self._lock = threading.Lock()
+        self._threshold = max(int(threshold), 1)
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._state = self.CLOSED
+        self._failures = 0
+        self._delay = base_delay
+        self._next_probe = 0.0
+        self._last_error = ""
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state != self.CLOSED
+
+    def record_success(self) -> Optional[str]:
+        """
+        请求成功
+        :return: 从打开恢复为关闭时返回 CLOSED
+        """
+        with self._lock:
+            self._failures = 0
+            if self._state == self.CLOSED:
+                return None
+            self._state = self.CLOSED
+            self._delay = self._base_delay
+            self._last_error = ""
+            return self.CLOSED
+
+    def record_failure(self, kind: str, error: str) -> Optional[str]:
+        """
+        请求失败
+        :param kind: NETWORK 或 AUTH
+        :param error: 错误信息
+        :return: 熔断打开或失败类型变化时返回新状态
+        """
+        with self._lock:
+            self._failures += 1
+            self._last_error = error
+            if self._state == kind or self._failures < self._threshold:
+                return None
+            if self._state == self.CLOSED:
+                self._next_probe = time.monotonic() + self._delay
+            self._state = kind
+            return kind
+
+    def try_probe(self) -> bool:
+        """
+        熔断打开时是否到了探测时间，到期则预约下次探测（间隔翻倍），保证同一时间只有一个探测
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if now < self._next_probe:
+                return False
+            self._delay = min(self._delay * 2, self._max_delay)
+            self._next_probe = now + self._delay
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        熔断状态
+        """
+        with self._lock:
+            return {"state": self._state, "failures": self._failures, "last_error": self._last_error,
+                    "next_probe": round(max(self._next_probe - time.monotonic(), 0)) if self.is_open else None}
+
+
+class ZspaceError(Exception):
+    """
+    极空间接口请求失败或返回错误码
+    """
+    # 网络不可用、登录失效、接口返回错误码、熔断中未请求、等待限流时已取消
+    NETWORK = CircuitBreaker.NETWORK
+    AUTH = CircuitBreaker.AUTH
+    API = "api"
+    OPEN = "open"
+    CANCELLED = "cancelled"
+
+    def __init__(self, message: str, response: "ZspaceResponse" = None, kind: str = API):
+        super().__init__(message)
+        self.response = response
+        self.kind = kind
+
+
+@dataclass
+class ZspaceResponse:
+    """
+    极空间接口响应
+    """
+    code: str
+    msg: str = ""
+    data: Any = None
+
+    # 成功
+    CODE_OK = "200"
+    # 刷新任务进行中
+    CODE_BUSY = "N120024"
+
+    @property
+    def ok(self) -> bool:
+        return self.code == self.CODE_OK
+
+    @classmethod
+    def parse(cls, payload: Any) -> "ZspaceResponse":
+        """
+        解析响应json
+        :raises ZspaceError: 响应不是极空间接口格式
+        """
+        if not isinstance(payload, dict) or "code" not in payload:
+            raise ZspaceError(f"极空间响应格式错误：{payload}")
+        return cls(code=str(payload.get("code")), msg=payload.get("msg") or "", data=payload.get("data"))
+
+
+@dataclass(frozen=True)
+class RescanStatus:
+    """
+    分类刷新任务状态
+    """
+    code: str
+    task_status: Optional[int]
+
+    # 任务完成
+    STATUS_DONE = 2
+
+    @property
+    def finished(self) -> bool:
+        """
+        任务结束（完成或接口不再返回进行中）
+        """
+        return self.code not in (ZspaceResponse.CODE_OK, ZspaceResponse.CODE_BUSY) \
+            or self.task_status == self.STATUS_DONE
+
+
+@dataclass(frozen=True)
+class ZspaceCredential:
+    """
+    极空间web登录凭证，同一cookie在进程内只解析一次
+    """
+    # 传入 HTTP 前编码后的cookie
+    cookie: str
+    token: str
+    device_id: str = ""
+    device: str = ""
+    version: str = ""
+    l: str = ""
+    nasid: str = ""
+    # 极影视接口表单携带的凭证字段
+    form_fields: Tuple[str, ...] = ("token", "device_id", "device", "version", "l", "nasid")
+
+    # 凭证字段 -> cookie中的字段，token字段的顺序由各插件指定
+    COOKIE_FIELDS = {
+        "device_id": ("device_id",),
+        "device": ("device",),
+        "version": ("version",),
+        "l": ("_l",),
+        "nasid": ("nas_id",),
+    }
+    # 极影视接口需要的字段
+    MEDIA_FIELDS = ("token", "device_id", "device", "version", "l", "nasid")
+    # 凭证字段 -> 表单中的字段，同名的不列出
+    FORM_KEYS = {"l": "_l"}
+
+    @classmethod
+    def parse(cls, cookie_str: str, required: Tuple[str, ...] = ("token",),
+              token_keys: Tuple[str, ...] = ("token", "zenithtoken"),
+              form_fields: Tuple[str, ...] = MEDIA_FIELDS) -> "ZspaceCredential":
+        """
+        解析极空间web端cookie
+        :param cookie_str: cookie
+        :param required: 必要的凭证字段
+        :param token_keys: token取cookie中的字段，按顺序取第一个有值的
+        :param form_fields: 极影视接口表单携带的凭证字段
+        :raises ValueError: cookie格式错误或缺少必要字段
+        """
+        if not cookie_str:
+            raise ValueError("cookie未配置")
+        registry = _registry()
+        cookie_fields = dict(cls.COOKIE_FIELDS, token=token_keys)
+        fields = registry.credentials.get((cookie_str, token_keys))
+        if fields is None:
+            try:
+                cookie = RequestUtils.cookie_parse(cookie_str)
+            except Exception as e:
+                raise ValueError(f"cookie解析失败：{str(e)}")
+            fields = {"cookie": quote(cookie_str, safe='=; ')}
+            for name, keys in cookie_fields.items():
+                fields[name] = next((cookie[key] for key in keys if cookie.get(key)), "")
+            with registry.lock:
+                fields = registry.credentials.setdefault((cookie_str, token_keys), fields)
+        missing_fields = [cookie_fields[name][0] for name in required if not fields.get(name)]
+        if missing_fields:
+            raise ValueError(f"cookie中缺少必要字段：{missing_fields}")
+        return cls(form_fields=form_fields, **fields)
+
+    @property
+    def form(self) -> Dict[str, Any]:
+        """
+        极影视接口公共表单
+        """
+        form = {self.FORM_KEYS.get(name, name): getattr(self, name) for name in self.form_fields}
+        form = {key: value for key, value in form.items() if value}
+        form.setdefault("device", "PC电脑")
+        form["plat"] = "web"
+        return form
+
+
+class ZspaceClient:
+    """
+    极空间web接口客户端
+    同一极空间地址的客户端共用一个连接池和限流器，最后一个客户端关闭时释放连接池
+    """
+
+    def __init__(self, host: str, credential: ZspaceCredential, timeout: int = 20, pool_size: int = 2,
+                 rate_limit: Optional[float] = None, max_inflight: Optional[int] = None,
+                 on_breaker_change: Optional[Callable[[str, str], None]] = None,
+                 cancel: Optional[threading.Event] = None):
+        """
+        :param host: 极空间地址，如 http://127.0.0.1:5055
+        :param credential: 登录凭证
+        :param timeout: 请求超时(秒)
+        :param pool_size: 连接池大小，同一地址取各客户端的最大值
+        :param rate_limit: 每秒请求数，0为不限制，None沿用该地址当前配置
+        :param max_inflight: 同时进行的请求数，0为不限制，None沿用该地址当前配置
+        :param on_breaker_change: 本客户端的请求使熔断状态变化时回调 (新状态, 错误信息)，用于发送一次通知
+        :param cancel: 取消标记，置位后等待限流的请求不再发出；已发出的请求最长在超时时间后结束
+        """
+        self._host = self.normalize_host(host)
+        self._credential = credential
+        self._base_form = credential.form
+        self._headers = {"Cookie": credential.cookie}
+        self._timeout = timeout
+        self._session, self._submit_session = self.__acquire(self._host, pool_size)
+        self._limiter = self.__limiter(self._host, rate_limit, max_inflight)
+        self._breaker = self.__breaker(self._host)
+        self._auth_breaker = self.__breaker((self._host, credential.cookie))
+        self._on_breaker_change = on_breaker_change
+        self._cancel = cancel
+        self._closed = False
+
+    @staticmethod
+    def normalize_host(host: str) -> str:
+        """
+        补全协议，去掉末尾的/
+        """
+        if not host:
+            return host
+        if not host.startswith("http"):
+            host = "http://" + host
+        return host.rstrip("/")
+
+    @staticmethod
+    def __acquire(host: str, pool_size: int) -> Tuple[requests.Session, requests.Session]:
+        """
+        获取地址共用的查询会话及提交会话，两者重试策略不同，连接池不足时扩容
+        """
+        registry = _registry()
+        with registry.lock:
+            pool = registry.pools.get(host)
+            if pool is None:
+                pool = registry.pools[host] = {"session": ZspaceClient.__session(),
+                                               "submit_session": ZspaceClient.__session(),
+                                               "size": 0, "refs": 0}
+            if pool_size > pool["size"]:
+                for key, policy in (("session", RETRY_POLICY), ("submit_session", SUBMIT_RETRY_POLICY)):
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=policy)
+                    pool[key].mount("http://", adapter)
+                    pool[key].mount("https://", adapter)
+                pool["size"] = pool_size
+            pool["refs"] += 1
+            return pool["session"], pool["submit_session"]
+
+    @staticmethod
+    def __session() -> requests.Session:
+        session = requests.Session()
+        session.verify = False
+        session.headers.update({"User-Agent": settings.USER_AGENT})
+        # cookie由各客户端按请求携带，不接受服务端写入会话
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    @staticmethod
+    def __limiter(host: str, rate_limit: Optional[float], max_inflight: Optional[int]) -> RateLimiter:
+        """
+        获取地址共用的限流器，指定了配置时更新
+        """
+        registry = _registry()
+        with registry.lock:
+            limiter = registry.limiters.get(host)
+            if limiter is None:
+                limiter = registry.limiters[host] = RateLimiter()
+            if rate_limit is not None or max_inflight is not None:
+                stats = limiter.stats()
+                limiter.configure(stats["rate"] if rate_limit is None else rate_limit,
+                                  stats["max_inflight"] if max_inflight is None else max_inflight)
+            return limiter
+
+    @staticmethod
+    def __breaker(key: Any) -> CircuitBreaker:
+        """
+        获取共用的熔断器
+        :param key: 网络熔断器为地址，登录熔断器为 (地址, cookie)
+        """
+        registry = _registry()
+        with registry.lock:
+            breaker = registry.breakers.get(key)
+            if breaker is None:
+                breaker = registry.breakers[key] = CircuitBreaker()
+            return breaker
+
+    def __open_breaker(self) -> Optional[CircuitBreaker]:
+        """
+        打开的熔断器，网络熔断优先，都未打开返回None
+        """
+        return next((breaker for breaker in (self._breaker, self._auth_breaker) if breaker.is_open), None)
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def credential(self) -> ZspaceCredential:
+        return self._credential
+
+    @property
+    def available(self) -> bool:
+        """
+        熔断未打开
+        """
+        return self.__open_breaker() is None
+
+    def form(self, **kwargs) -> Dict[str, Any]:
+        """
+        公共表单附加参数
+        """
+        return dict(self._base_form, **kwargs)
+
+    def request(self, path: str, data: Dict[str, Any] = None, probe: bool = False,
+                idempotent: bool = True) -> ZspaceResponse:
+        """
+        POST请求极空间接口
+        :param path: 接口路径，如 /zvideo/classification/list
+        :param data: 表单数据
+        :param probe: 熔断探测请求，熔断打开时也发出
+        :param idempotent: 重复请求没有副作用，网关错误时可重试
+        :raises ZspaceError: 熔断中、网络错误、登录失效、HTTP错误或响应格式错误
+        """
+        if not probe and not self.available:
+            raise ZspaceError(f"极空间暂停请求（{self.breaker_message()}），跳过 {path}", kind=ZspaceError.OPEN)
+        url = "%s%s?&rnd=%s&webagent=v2" % (self._host, path, self.generate_string())
+        if not self._limiter.acquire(self._cancel):
+            raise ZspaceError(f"已取消，跳过 {path}", kind=ZspaceError.CANCELLED)
+        try:
+            session = self._session if idempotent else self._submit_session
+            res = session.post(url, data=data, headers=self._headers, timeout=self._timeout)
+            if res.status_code in AUTH_HTTP_STATUS:
+                raise self.__failure(ZspaceError.AUTH, f"请求极空间接口 {path} 登录失效：HTTP {res.status_code}")
+            res.raise_for_status()
+            response = ZspaceResponse.parse(res.json())
+        except ZspaceError as e:
+            if e.kind == ZspaceError.API:
+                raise self.__failure(ZspaceError.NETWORK, str(e)) from e
+            raise
+        except (requests.RequestException, ValueError) as e:
+            raise self.__failure(ZspaceError.NETWORK, f"请求极空间接口 {path} 失败：{str(e)}") from e
+        finally:
+            self._limiter.release()
+        if response.code in AUTH_CODES:
+            raise self.__failure(ZspaceError.AUTH, f"极空间登录失效：{response.code} {response.msg}", response)
+        # 请求成功说明地址可以连接且cookie有效，两个熔断器都关闭，只通知一次
+        closed = [breaker.record_success() for breaker in (self._breaker, self._auth_breaker)]
+        self.__notify_breaker(CircuitBreaker.CLOSED if any(closed) else None, "")
+        return response
+
+    def __failure(self, kind: str, message: str, response: ZspaceResponse = None) -> ZspaceError:
+        """
+        记录失败到熔断器，登录失效只记录到本cookie的熔断器
+        :return: 待抛出的异常
+        """
+        breaker = self._auth_breaker if kind == ZspaceError.AUTH else self._breaker
+        if kind == ZspaceError.AUTH:
+            # 登录失效说明地址可以连接
+            self._breaker.record_success()
+        self.__notify_breaker(breaker.record_failure(kind, message), message)
+        return ZspaceError(message, response, kind=kind)
+
+    def __notify_breaker(self, state: Optional[str], message: str):
+        """
+        熔断状态变化时回调
+        """
+        if not state:
+            return
+        if state == CircuitBreaker.CLOSED:
+            logger.info(f"极空间 {self._host} 恢复请求")
+        else:
+            logger.warning(f"极空间 {self._host} 暂停请求：{message}")
+        if self._on_breaker_change:
+            try:
+                self._on_breaker_change(state, message)
+            except Exception as e:
+                logger.error(f"极空间熔断通知失败：{str(e)}")
+
+    def ready(self) -> bool:
+        """
+        是否可以请求极空间
+        熔断打开时到达探测时间才发起一次轻量探测，探测成功即恢复；未到探测时间直接返回False
+        """
+        breaker = self.__open_breaker()
+        if not breaker:
+            return True
+        if not breaker.try_probe():
+            return False
+        try:
+            self.request("/action/list", {"type": "notify", "start_id": 0, "num": "1",
+                                          "token": self._credential.token}, probe=True)
+        except ZspaceError as e:
+            logger.info(f"极空间 {self._host} 探测失败：{str(e)}")
+            return False
+        return self.available
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        """
+        本客户端的熔断状态：打开的熔断器，都未打开时为地址的网络熔断器
+        """
+        return (self.__open_breaker() or self._breaker).stats()
+
+    def breaker_message(self) -> str:
+        """
+        熔断原因描述
+        """
+        stats = self.breaker_stats()
+        if stats["state"] == CircuitBreaker.CLOSED:
+            return "正常"
+        reason = "cookie已失效，请更新cookie" if stats["state"] == CircuitBreaker.AUTH else "极空间无法连接"
+        return f"{reason}，{stats['next_probe']}秒后重试"
+
+    def call(self, path: str, data: Dict[str, Any] = None, idempotent: bool = True) -> ZspaceResponse:
+        """
+        请求极空间接口，返回错误码时抛出异常
+        :raises ZspaceError: 请求失败或返回错误码
+        """
+        response = self.request(path, data, idempotent=idempotent)
+        if not response.ok:
+            raise ZspaceError(f"极空间接口 {path} 返回错误：{response.code} {response.msg}", response)
+        return response
+
+    def limiter_stats(self) -> Dict[str, Any]:
+        """
+        该地址限流配置及累计统计（含其他插件的请求）
+        """
+        return self._limiter.stats()
+
+    def classifications(self) -> Dict[str, Any]:
+        """
+        极影视分类 名称->ID
+        """
+        response = self.call("/zvideo/classification/list", self.form())
+        if not isinstance(response.data, list):
+            raise ZspaceError(f"极影视分类列表格式错误：{response.data}", response)
+        return {item["name"]: item["id"] for item in response.data}
+
+    def submit_rescan(self, classification_id: Any) -> str:
+        """
+        提交分类刷新
+        :return: 任务ID
+        """
+        response = self.call("/zvideo/classification/rescan", self.form(classification_id=classification_id),
+                             idempotent=False)
+        task_id = (response.data or {}).get("task_id")
+        if not task_id:
+            raise ZspaceError(f"极影视分类刷新未返回任务ID：{response.data}", response)
+        return task_id
+
+    def rescan_status(self, classification_id: Any, task_id: str) -> RescanStatus:
+        """
+        查询分类刷新任务状态
+        """
+        response = self.request("/zvideo/classification/rescan/result",
+                                self.form(classification_id=classification_id, task_id=task_id))
+        return RescanStatus(code=response.code, task_status=(response.data or {}).get("task_status"))
+
+    def messages(self, msg_type: str = "notify", num: int = 5) -> List[Dict[str, Any]]:
+        """
+        系统消息列表
+        """
+        response = self.call("/action/list", {"type": msg_type, "start_id": 0, "num": str(num),
+                                              "token": self._credential.token})
+        messages = (response.data or {}).get("list")
+        return messages if isinstance(messages, list) else []
+
+    def mark_known(self, message_id: Any, msg_type: str = "notify"):
+        """
+        系统消息设为已读
+        """
+        self.call("/action/known", {"ids": message_id, "type": msg_type, "start_id": 0, "num": "20",
+                                    "token": self._credential.token})
+
+    def close(self):
+        """
+        释放连接池，最后一个客户端关闭时关闭会话
+        """
+        if self._closed:
+            return
+        self._closed = True
+        registry = _registry()
+        with registry.lock:
+            pool = registry.pools.get(self._host)
+            if not pool or pool["session"] is not self._session:
+                return
+            pool["refs"] -= 1
+            if pool["refs"] > 0:
+                return
+            registry.pools.pop(self._host)
+        try:
+            self._session.close()
+            self._submit_session.close()
+        except Exception as e:
+            logger.debug(f"关闭极空间连接失败：{str(e)}")
+
+    @staticmethod
+    def generate_string():
+        timestamp = str(time.time())  # 获取当前的时间戳
+        four_digit_random = str(random.randint(1000, 9999))  # 生成四位的随机数
+        return f"{timestamp}_{four_digit_random}"  # 返回格式化后的字符串